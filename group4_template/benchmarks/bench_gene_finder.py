@@ -0,0 +1,53 @@
+""" Benchmark of the lazy Transcribe/Translate stages for the call patterns of cli.py and main.py. """
+
+import random
+import time
+
+from group4.gene_finder import Transcribe, Translate
+
+# stages the constructors used to compute eagerly
+EAGER_STAGES = ['cdna', 'f_mrna', 'r_mrna', 'genes', 'genes_data', 'proteins', 'proteins_table']
+
+
+def random_dna(length: int) -> str:
+    """ Returns a random dna sequence of given length. """
+    return ''.join(random.choice('ACGT') for _ in range(length))
+
+
+def eager(cls, **kwargs):
+    """ Builds an object and computes all its stages, like the former constructors. """
+    obj = cls(**kwargs)
+    for stage in EAGER_STAGES:
+        getattr(obj, stage, None)
+    return obj
+
+
+def timeit(func, repeat: int = 3) -> float:
+    """ Returns the best wall time of repeated calls of a function in seconds. """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    random.seed(4)
+    dna = random_dna(1_000_000)
+    patterns = {
+        'transcribe: genes_data': (Transcribe, lambda obj: obj.genes_data),
+        'translate: proteins_table': (Translate, lambda obj: obj.proteins_table),
+        'predict/main: proteins': (Translate, lambda obj: obj.proteins),
+        'forward strand genes': (Transcribe, lambda obj: obj.genes['forward']),
+    }
+    print(f'{"pattern":<28} {"eager (s)":>10} {"lazy (s)":>10} {"speedup":>8}')
+    for name, (cls, use) in patterns.items():
+        reverse = not name.startswith('forward')
+        t_eager = timeit(lambda: use(eager(cls, dna=dna, reverse=reverse)))
+        t_lazy = timeit(lambda: use(cls(dna=dna, reverse=reverse)))
+        print(f'{name:<28} {t_eager:>10.4f} {t_lazy:>10.4f} {t_eager / t_lazy:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+""" Benchmark of the cell by cell, the vectorized and the banded kernel of MSA.pairwise_alignment. """
+
+import random
+import time
+
+from group4.sequence_assembly import MSA
+
+
+def random_read(length: int) -> str:
+    """ Returns a random nucleotide sequence of given length. """
+    return ''.join(random.choice('ACGT') for _ in range(length))
+
+
+def timeit(func, repeat: int = 3) -> float:
+    """ Returns the best wall time of repeated calls of a function in seconds. """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    random.seed(4)
+    loop, vectorized, banded = MSA(kernel='loop'), MSA(kernel='numpy'), MSA(band=16)
+    print(f'{"length":>8} {"loop (s)":>10} {"numpy (s)":>10} {"speedup":>8} {"band (s)":>10}')
+    for length in [50, 100, 250, 500, 2000]:
+        genome = random_read(2 * length)
+        seq1, seq2 = genome[:length], genome[length // 2: length // 2 + length]  # half overlapping reads
+        assert loop.pairwise_alignment(seq1, seq2) == vectorized.pairwise_alignment(seq1, seq2)
+        assert banded.pairwise_alignment(seq1, seq2) == vectorized.pairwise_alignment(seq1, seq2)
+
+        t_loop = timeit(lambda: loop.pairwise_alignment(seq1, seq2), repeat=1 if length > 500 else 3)
+        t_numpy = timeit(lambda: vectorized.pairwise_alignment(seq1, seq2))
+        t_band = timeit(lambda: banded.pairwise_alignment(seq1, seq2))
+        print(f'{length:>8} {t_loop:>10.4f} {t_numpy:>10.4f} {t_loop / t_numpy:>7.1f}x {t_band:>10.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,26 @@
+import asyncio
+import io
+import itertools
+import json
 import os
 import re
 import time
 import requests
-from group4.utils import *  # URL, PUT_Request, GET_Request, Program, Database_PDB, RID, GET_query_head, url_request_head, DATA_CACHE
+from functools import partial
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import quote
+from zipfile import ZipFile
+from group4.utils import *  # URL, NCBI_URL, BLAST_FASTA, PUT_Request, GET_Request, Program, Database_PDB, RID, RTOE, GET_query_head, url_request_head, DATA_CACHE
+from group4.blast_cache import BlastCache
+
+SUBMIT_INTERVAL = 10  # Do not contact the server more often than once every 10 seconds.
+POLL_INTERVAL = 60  # Maximum time between two status checks of a RID, in seconds.
+FIRST_POLL = 10  # Delay of the first status check when the server gives no estimate, in seconds.
+POLL_BACKOFF = 2  # Factor by which the delay between two status checks grows, up to POLL_INTERVAL.
+BATCH_QUERIES = 10  # Maximum number of sequences submitted in one multi-FASTA request.
+BATCH_LETTERS = 5000  # Maximum number of residues submitted in one multi-FASTA request, bounds the url length.
+STREAM_CHUNK = 1 << 16  # Number of characters of a JSON result read at once.
 
 
 # Debug/auxiliary functions:
@@ -47,6 +65,245 @@ def _clean_cache(file:str=None)->None:
     return
 
 
+def _get_cache(cache):
+
+    """Resolve the cache argument of Blast_sequence and Blast_orfs.
+
+    :param cache: bool or BlastCache.
+        -True for the default cache in DATA_CACHE, False or None for no cache, or a BlastCache.
+    :return: BlastCache or None.
+        -cache to consult.
+    """
+    if cache is True:
+        return BlastCache()
+    if cache is False or cache is None:
+        return None
+    return cache
+
+
+def _fasta_batches(orfs: list, max_queries: int = BATCH_QUERIES, max_letters: int = BATCH_LETTERS) -> list:
+
+    """Pack sequences in order into batches bounded by the number of sequences and residues.
+    A sequence longer than max_letters forms a batch on its own.
+
+    :param orfs: list.
+        -sequences to be aligned.
+    :param max_queries: int.
+        -maximum number of sequences of a batch.
+    :param max_letters: int.
+        -maximum number of residues of a batch.
+    :return: list.
+        -lists of the indices of the sequences of every batch.
+    """
+    if not max_queries >= 1:
+        raise AssertionError('Maximum number of queries should be greater than or equal to 1')
+    batches = []
+    letters = 0
+    for i, orf in enumerate(orfs):
+        if not batches or len(batches[-1]) >= max_queries or letters + len(orf) > max_letters:
+            batches.append([])
+            letters = 0
+        batches[-1].append(i)
+        letters += len(orf)
+    return batches
+
+
+def _multi_fasta(orfs: list, indices: list) -> str:
+
+    """Format sequences as a multi-FASTA query, titled "query<index>" so the results can be demultiplexed.
+
+    :param orfs: list.
+        -sequences to be aligned.
+    :param indices: list.
+        -indices of the sequences of the batch.
+    :return: str.
+        -url encoded multi-FASTA text, to be used as QUERY of a put request.
+    """
+    fasta = "\n".join(f">query{i}\n{orfs[i]}" for i in indices)
+    return quote(fasta, safe="")
+
+
+class BlastClient:
+
+    """Client of the BLAST URL API holding a pooled session, so consecutive requests reuse their connections.
+
+    Failed connections and the status codes 429, 500, 502, 503 and 504 are retried with exponential backoff.
+    Status checks start after the estimated time of the search (RTOE) returned by the put request and then back off
+    adaptively, so short sequences are not polled a minute later at the earliest.
+    """
+
+    def __init__(self, url: str = URL, retries: int = 3, backoff: float = 1.0, pool_size: int = 10,
+                 submit_interval: float = None):
+
+        """
+        :param url: str.
+            -url of the BLAST server (default is URL, the NCBI URL unless GROUP4_BLAST_URL is set).
+        :param retries: int.
+            -maximum number of retries of a request (default is 3).
+        :param backoff: float.
+            -backoff factor of the retries in seconds (default is 1.0).
+        :param pool_size: int.
+            -maximum number of connections kept alive (default is 10).
+        :param submit_interval: float.
+            -minimum time between two submissions in seconds (default is None, 10 for the NCBI server and 0 for
+            other servers).
+        """
+        self.url = url
+        self.source = "" if url == NCBI_URL else url  # identifies the backend of cached results
+        if submit_interval is None:
+            submit_interval = SUBMIT_INTERVAL if url == NCBI_URL else 0
+        self.submit_interval = submit_interval
+        self.session = requests.Session()
+        # only status checks and results are retried, retrying a PUT would submit the search again
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset({"GET"}))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def put(self, seq: str, program: str = Program, database: str = Database_PDB, filters: str = "",
+            email: str = "", debug_mode=False):
+
+        """Submit a PUT query to Blast and return the response object.
+
+        :param seq: str.
+            -Aminoacidic sequence to be aligned.
+        :param debug_mode: bool.
+            -If True it will print the query submitted to the server.
+        :return: response object.
+            -The response obtained from the request.
+        """
+        query = "QUERY=" + seq + "&"
+        PUT_query = self.url + PUT_Request + query + program + database + filters + email
+        if debug_mode:
+            print(PUT_query)
+        return self.session.put(PUT_query)
+
+    def status(self, rid: str) -> str:
+
+        """Check the status of a request.
+
+        :param rid: str.
+            -Request ID returned when the search was submitted.
+        :return: str.
+            -Status of the research.
+        """
+        url_submit = self.url + 'CMD=Get&FORMAT_OBJECT=SearchInfo&RID=' + rid
+        return extract_attribute(self.session.get(url_submit), "Status=")
+
+    def results(self, rid: str, response_format: str = "html"):
+
+        """Get the results of a ready request in html or json.zip format.
+
+        :param rid: str.
+            -Request ID returned when the search was submitted.
+        :param response_format: str.
+            -Format type of the response results (default is "html", allowed is "json").
+        :return: response object.
+            -response object generated after submitting the get query, None if it failed.
+        """
+        GET_query = self.url + GET_Request + "RID=" + rid  # /CMD=get&RID=rid"
+        if response_format == "json":
+            GET_query = GET_query + "&FORMAT_TYPE=JSON2"  # /CMD=get&RID=rid&FORMAT_TYPE=JSON2""
+        s = self.session.get(GET_query)
+        if not s.ok:
+            print(f"{GET_query} returned bad status code: {s.status_code}")
+            return
+        print(GET_query)
+        return s
+
+    def wait(self, rid: str, rtoe=None, poll_interval: float = POLL_INTERVAL) -> str:
+
+        """Wait until a request is ready or its search ended without results. The first check is after the estimated
+        time of the search, then the delay grows from FIRST_POLL by POLL_BACKOFF up to poll_interval.
+
+        :param rid: str.
+            -Request ID returned when the search was submitted.
+        :param rtoe: str or float.
+            -estimated time of the search in seconds returned by the put request (default is None, unknown).
+        :param poll_interval: float.
+            -maximum time between two status checks in seconds (default is 60).
+        :return: str.
+            -final status of the request, "READY", "FAILED" or "UNKNOWN" (e.g. expired or unknown to the server).
+        """
+        for delay in _poll_delays(rtoe, poll_interval):
+            print(f"Will wait and check in {delay:g} seconds")
+            time.sleep(delay)
+            status = self.status(rid)
+            if status == 'READY':
+                print("The status is ready")
+                return status
+            if status in ('FAILED', 'UNKNOWN'):
+                print(f"The search of request {rid} ended with status {status}")
+                return status
+
+
+def _poll_delays(rtoe=None, poll_interval: float = POLL_INTERVAL):
+
+    """Yield the delays before the status checks of a request.
+
+    :param rtoe: str or float.
+        -estimated time of the search in seconds, the first delay (default is None, FIRST_POLL is used).
+    :param poll_interval: float.
+        -maximum delay in seconds.
+    :return: generator.
+        -delays in seconds.
+    """
+    try:
+        first = float(rtoe)
+    except (TypeError, ValueError):
+        first = FIRST_POLL
+    yield min(first, poll_interval)
+    delay = min(FIRST_POLL, poll_interval)
+    while True:
+        yield delay
+        delay = min(delay * POLL_BACKOFF, poll_interval)
+
+
+_client = None  # client shared by the module functions
+
+
+def _get_client():
+
+    """Return the client shared by the module functions, created on first use. It searches the FASTA file of
+    GROUP4_BLAST_FASTA offline if set, else the server of URL.
+
+    :return: BlastClient or LocalClient.
+        -shared client.
+    """
+    global _client
+    if _client is None and BLAST_FASTA:
+        from group4.local_blast import LocalClient, LocalSearch  # NumPy search, only needed offline
+        _client = LocalClient(LocalSearch(BLAST_FASTA))
+    elif _client is None:
+        _client = BlastClient()
+    return _client
+
+
+def set_backend(client) -> None:
+
+    """Replace the backend of the module functions, Blast_sequence and Blast_orfs.
+
+    :param client: BlastClient or LocalClient.
+        -e.g. BlastClient(url=LocalBlastServer(...).url) or LocalClient(LocalSearch("pdb_seqres.txt")),
+        None restores the default backend.
+    :return: None.
+    """
+    global _client
+    _client = client
+    return
+
+
+def _cache_key(seq: str, program: str, database: str, filters: str, file_type: str) -> str:
+
+    """Key of a query in the cache, which also depends on the backend answering it.
+
+    :return: str.
+        -key of the query, see BlastCache.key.
+    """
+    return BlastCache.key(seq, program, database, filters, file_type, _get_client().source)
+
+
 ################################################################################################################
 
 # Main functions:
@@ -71,11 +328,7 @@ def query_Blast(seq: str, program: str = Program, database: str = Database_PDB,
     :return: response object.
         -The response obtained from the request.
     """
-    query = "QUERY=" + seq + "&"
-    PUT_query = URL + PUT_Request + query + program + database + filters + email
-    if debug_mode:
-        print(PUT_query)
-    p = requests.put(PUT_query)  # Submit the request to the BLAST site
+    p = _get_client().put(seq, program, database, filters, email, debug_mode)  # Submit the request to the BLAST site
     return p
 
 
@@ -105,10 +358,7 @@ def check_request_status(rid:str)->str:
     :return: str
         -Status of the research
         """
-    url_submit = URL + 'CMD=Get&FORMAT_OBJECT=SearchInfo&RID=' + rid
-    # Submit the request of the status:
-    submit_request = requests.get(url_submit)
-    query_status = extract_attribute(submit_request, "Status=")
+    query_status = _get_client().status(rid)  # Submit the request of the status
     return query_status
 
 
@@ -122,16 +372,7 @@ def get_results(rid:str, response_format:str="html"):
     :return: response object
         -response object generated after submitting the get query
         """
-    GET_query = GET_query_head + rid  # /CMD=get&RID=rid"
-    if response_format == "json":
-        GET_query = GET_query_head + rid + "&FORMAT_TYPE=JSON2"  # /CMD=get&RID=rid&FORMAT_TYPE=JSON2""   
-    s = requests.get(GET_query)
-    if not s.ok:
-        print(f"{GET_query} returned bad status code: {s.status_code}")
-        return
-    else:
-        print(GET_query)
-        return s
+    return _get_client().results(rid, response_format)
 
 
 def download_html_file(s, filename:str="temporary.html"):
@@ -168,57 +409,216 @@ def download_zip_json_file(s, filename:str="temporary.zip"):
     return path
 
 
-def html_reader(filepath:str)->list:
+def _html_accessions(lines, per_query: bool = False):
 
-    """Read a html file and returns the list of accessions IDs
-    :param filepath: str
-        -name of the html file where the results are stored
-    :return: list
-        -list of the predicted protein (accession IDs)"""
-    assert filepath.lower().endswith('.html'), print("accept only html files")
-    with open(filepath, "r") as f:
-        list_accessions = []
-        for line in f.readlines():
-            if "<tr id=" in line:
-                i = line.index("<tr id=")
-                i2 = line.index("ind=")
-                accession = (line[i + 12:i2 - 2])
-                list_accessions.append(accession)
+    """Extract the accessions IDs from the lines of a html result.
+
+    :param lines: iterable.
+        -lines of the html result.
+    :param per_query: bool.
+        -If True the results of a multi-FASTA query are split by the "Query=" line of every sequence.
+    :return: list or dict.
+        -list of the predicted protein (accession IDs), or a dictionary of the lists by query title.
+    """
+    list_accessions = []
+    dict_accessions = {}
+    for line in lines:
+        if per_query and "Query=" in line:
+            title = re.sub(r"<[^>]+>", "", line).split("Query=", 1)[1].split()
+            list_accessions = dict_accessions.setdefault(title[0] if title else "", [])
+        if "<tr id=" in line:
+            i = line.index("<tr id=")
+            i2 = line.index("ind=")
+            accession = (line[i + 12:i2 - 2])
+            list_accessions.append(accession)
+    if per_query:
+        return dict_accessions
     return list_accessions
 
 
-def zip_reader(filepath):
-    """Extract a zip json file and returns the list of accessions IDs
+def _stream_hits(f):
 
-    :param filepath: str
-        -name of the zip file where the results are stored)
-    :return: list
-        -list of the predicted protein (accession IDs)"""
+    """Stream the hits of a JSON2 result one by one, so the hit list is never decoded as a whole.
 
-    from zipfile import ZipFile
-    import json
-    assert filepath.lower().endswith('.zip'), print("accept only zip files")
+    :param f: file object.
+        -text file of the JSON2 result of one query.
+    :return: generator.
+        -the query title, then the decoded hits.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, eof
+        chunk = f.read(STREAM_CHUNK)
+        eof = not chunk
+        buffer += chunk
+        return not eof
+
+    while '"hits"' not in buffer and fill():
+        pass
+    head, _, buffer = buffer.partition('"hits"')
+    match = re.search(r'"query_title"\s*:\s*', head)
+    yield decoder.raw_decode(head, match.end())[0] if match else ""
+
+    while "[" not in buffer and fill():
+        pass
+    buffer = buffer[buffer.find("[") + 1:]
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if not buffer:
+            if fill():
+                continue
+            return
+        if buffer[0] == "]":
+            return
+        try:
+            hit, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof or not fill():  # invalid json rather than an incomplete hit
+                raise
+            continue
+        yield hit
+        buffer = buffer[end:]
+
+
+def _zip_accessions(zf: ZipFile, per_query: bool = False):
+
+    """Extract the accessions IDs from the JSON2 files of a zip result.
+
+    :param zf: ZipFile.
+        -zip result.
+    :param per_query: bool.
+        -If True the results of a multi-FASTA query, one file per sequence, are split by the query title.
+    :return: list or dict.
+        -list of the predicted protein (accession IDs), or a dictionary of the lists by query title.
+    """
     list_accessions = []
-    zf = ZipFile(filepath)  # convert the zip file to a python object
+    dict_accessions = {}
     for filename in zf.namelist():
         if "_" in filename:  # Take only the file with the results
             with zf.open(filename) as f:
-                data = f.read()
-                d = json.loads(data)
-                list_of_hits = d["BlastOutput2"]['report']['results']['search']['hits']
-                for e in list_of_hits:
+                hits = _stream_hits(io.TextIOWrapper(f, encoding="utf-8"))
+                title = next(hits)
+                if per_query:
+                    list_accessions = dict_accessions.setdefault(title, [])
+                for e in hits:
                     ID = e['description'][0]["id"]
                     list_accessions.append(ID)
+    if per_query:
+        return dict_accessions
     return list_accessions
 
 
+def html_parser(content, per_query: bool = False):
+
+    """Parse html results in memory and returns the list of accessions IDs.
+
+    :param content: str or bytes.
+        -html result, e.g. the text of the response object.
+    :param per_query: bool.
+        -If True the results of a multi-FASTA query are split by the "Query=" line of every sequence
+        (default is False).
+    :return: list or dict.
+        -list of the predicted protein (accession IDs), or a dictionary with the title of every query as key
+        and its list as value if per_query is True.
+    """
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", errors="replace")
+    return _html_accessions(io.StringIO(content), per_query)
+
+
+def zip_parser(content: bytes, per_query: bool = False):
+
+    """Parse zipped JSON2 results in memory and returns the list of accessions IDs.
+
+    :param content: bytes.
+        -zip result, e.g. the content of the response object.
+    :param per_query: bool.
+        -If True the results of a multi-FASTA query, one file per sequence, are split by the query title
+        (default is False).
+    :return: list or dict.
+        -list of the predicted protein (accession IDs), or a dictionary with the title of every query as key
+        and its list as value if per_query is True.
+    """
+    with ZipFile(io.BytesIO(content)) as zf:
+        return _zip_accessions(zf, per_query)
+
+
+def html_reader(filepath:str, per_query:bool=False):
+
+    """Read a html file and returns the list of accessions IDs
+    :param filepath: str
+        -name of the html file where the results are stored
+    :param per_query: bool
+        -If True the results of a multi-FASTA query are split by the "Query=" line of every sequence
+        (default is False)
+    :return: list or dict
+        -list of the predicted protein (accession IDs), or a dictionary with the title of every query as key
+        and its list as value if per_query is True"""
+    assert filepath.lower().endswith('.html'), print("accept only html files")
+    with open(filepath, "r") as f:
+        return _html_accessions(f, per_query)
+
+
+def zip_reader(filepath, per_query=False):
+    """Extract a zip json file and returns the list of accessions IDs
+
+    :param filepath: str
+        -name of the zip file where the results are stored)
+    :param per_query: bool
+        -If True the results of a multi-FASTA query, one file per sequence, are split by the query title
+        (default is False)
+    :return: list or dict
+        -list of the predicted protein (accession IDs), or a dictionary with the title of every query as key
+        and its list as value if per_query is True"""
+    assert filepath.lower().endswith('.zip'), print("accept only zip files")
+    with ZipFile(filepath) as zf:  # convert the zip file to a python object
+        return _zip_accessions(zf, per_query)
+
+
 # def is_html(output_file):
 #     """Assess that the output file is in html format."""
 #     assert output_file[-4:] == "html", print("Save the results in html file format!")
 
 
+def _fetch_matches(rid: str, filename: str = "temporary", file_type: str = "html", keep_files: bool = True,
+                   per_query: bool = False):
+
+    """Get the results of a ready request and extract the hits in memory, saving the results if keep_files is True.
+
+    :param rid: str.
+        -Request ID returned when the search was submitted.
+    :param filename: str.
+        -file where the results are saved, without extension.
+    :param file_type: str.
+        -format of the results, "html" or "json".
+    :param keep_files: bool.
+        -If True the results are also saved in DATA_CACHE, else they are never written.
+    :param per_query: bool.
+        -If True the hits of a multi-FASTA query are returned by query title.
+    :return: list or dict.
+        -list of the predicted protein (accession IDs), or a dictionary of the lists by query title, None if the
+        results could not be downloaded.
+    """
+    s = get_results(rid, response_format=file_type)
+    if s is None:
+        return None
+    print("The sequence was successfully aligned!")
+    if file_type == "json":
+        list_matches = zip_parser(s.content, per_query)  # extract the hits IDs
+        if keep_files:
+            download_zip_json_file(s, filename + ".zip")  # save the zip/json file
+    else:
+        list_matches = html_parser(s.text, per_query)  # extract the hits IDs
+        if keep_files:
+            download_html_file(s, filename + ".html")  # save the html file
+    return list_matches
+
+
 def Blast_sequence(seq: str, filename = "temporary", program: str = Program, database: str = Database_PDB,
-                   filters: str = "", email: str = "", file_type = "html", keep_files = True)->list:
+                   filters: str = "", email: str = "", file_type = "html", keep_files = True, cache=True)->list:
 
     """Given sequence, it blast it against the specified database and return list of possible proteins.
     :param seq: str.
@@ -234,38 +634,204 @@ def Blast_sequence(seq: str, filename = "temporary", program: str = Program, dat
     :param filename: str.
         -file where the results will be stored if keep_file is in default mode.
     param keep_files: bool
-        -If False will erase the saved file results, else it will keep them
-    :return: str.
-        -query which will be submitted to blast server.
+        -If False the results are only parsed in memory, else they are also saved in a file
+    :param cache: bool or BlastCache.
+        -cache of hits keyed by sequence and parameters, consulted before and filled after the query
+        (default is True, the cache in DATA_CACHE).
+    :return: list.
+        -list of the predicted proteins (accession IDs), None if the search failed.
     """
+    cache = _get_cache(cache)
+    key = _cache_key(seq, program, database, filters, file_type)
+    if cache is not None:
+        list_matches = cache.get(key)
+        if list_matches is not None:
+            print("The results are already in the cache")
+            return list_matches
+
     p = query_Blast(seq, program, database, filters, email, debug_mode=False)  # Submit the request to the BLAST site
     rid = extract_attribute(p, RID)  # Extract the request ID (rid) that will be used for next steps
-    while True:
-        Status = check_request_status(rid)
-        if Status == 'READY':
-            print("The status is ready")
-            break
-        else:
-            print("Will wait and check in 60 seconds")
-            time.sleep(60)  # Do not poll for any single RID more often than once a minute.
-    s = get_results(rid, response_format=file_type)
-    print("The sequence was successfully aligned!")
-    if file_type == "json":
-        filename = filename + ".zip"
-        path = download_zip_json_file(s, filename)  # save the zip/json file
-        list_matches = zip_reader(path)  # extract the hits IDs
-    else:
-        filename = filename + ".html"
-        path = download_html_file(s, filename)  # save the zip/json file
-        list_matches = html_reader(path)  # extract the hits IDs
-
-    if keep_files is False:  # delete the result files
-        os.remove(path)
+    if not rid:
+        print("The search was not submitted, no request ID was returned")
+        return None
+    # first check after the estimated time of the search
+    status = _get_client().wait(rid, extract_attribute(p, RTOE))
+    if status != 'READY':
+        return None  # not cached, the search may be submitted again
+    list_matches = _fetch_matches(rid, filename, file_type, keep_files)
+    if cache is not None and list_matches is not None:
+        cache.put(key, list_matches)
     return list_matches
 
 
+class _RateLimiter:
+
+    """Spaces out the calls of concurrent coroutines by a minimum interval."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = None  # earliest time of the next call
+        self._lock = None  # created in the running event loop
+
+    async def wait(self) -> None:
+
+        """Wait until the next call is allowed.
+
+        :return: None.
+        """
+        loop = asyncio.get_event_loop()
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = loop.time()
+            if self._next is not None and self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+async def _blast_concurrent(orfs: list, filenames: list, program: str, database: str, filters: str, email: str,
+                            file_type: str, keep_files: bool, submit_interval: float, poll_interval: float,
+                            per_query: bool = False, progress=None) -> list:
+
+    """Submit all sequences and poll the outstanding requests together, fetching the results as they become ready.
+
+    Submissions are spaced by submit_interval. The status of all outstanding requests is checked concurrently on one
+    schedule whose delay grows from FIRST_POLL up to poll_interval, skipping the requests whose estimated time (RTOE)
+    has not elapsed yet. The blocking requests calls run in the default thread pool of the event loop. A search which
+    can not be submitted, checked or fetched fails alone, the other searches are completed.
+
+    :param orfs: list.
+        -sequences to be aligned.
+    :param filenames: list.
+        -file of the results of every sequence, without extension.
+    :param submit_interval: float.
+        -minimum time between two submissions in seconds.
+    :param poll_interval: float.
+        -maximum time between two status checks of the outstanding requests in seconds.
+    :param per_query: bool.
+        -If True the sequences are multi-FASTA queries and their hits are returned by query title.
+    :param progress: callable.
+        -called with the index of a sequence whenever its search ends (default is None).
+    :return: list.
+        -list of the predicted proteins (accession IDs) of every sequence, None if the search failed.
+    """
+    loop = asyncio.get_event_loop()
+    limiter = _RateLimiter(submit_interval)
+    pending = {}  # index of the sequence to its request ID and the time it is expected to be ready
+    results = {}
+
+    def end(index: int, list_matches) -> None:
+        results[index] = list_matches
+        pending.pop(index, None)
+        if progress is not None:
+            progress(index)
+
+    async def submit(index: int, orf: str) -> None:
+        await limiter.wait()
+        try:
+            p = await loop.run_in_executor(None, partial(query_Blast, orf, program, database, filters, email))
+            rid = extract_attribute(p, RID)
+        except Exception as error:
+            print(f"The search of sequence {index + 1} was not submitted: {error!r}")
+            rid = None
+        if not rid:
+            end(index, None)
+            return
+        rtoe = next(_poll_delays(extract_attribute(p, RTOE), poll_interval))
+        pending[index] = (rid, loop.time() + rtoe)
+
+    submissions = asyncio.ensure_future(asyncio.gather(*(submit(i, orf) for i, orf in enumerate(orfs))))
+    delays = _poll_delays(None, poll_interval)
+    next(delays)
+    while not submissions.done() or pending:
+        await asyncio.sleep(next(delays))  # one shared polling schedule for all requests
+        if submissions.done() and submissions.exception() is not None:
+            raise submissions.exception()
+        now = loop.time()
+        outstanding = [(index, rid) for index, (rid, ready_at) in pending.items() if ready_at <= now]
+        statuses = await asyncio.gather(*(loop.run_in_executor(None, check_request_status, rid)
+                                          for _, rid in outstanding), return_exceptions=True)
+        ready = []
+        for (index, rid), status in zip(outstanding, statuses):
+            if status == 'READY':
+                ready.append((index, rid))
+            elif status in ('FAILED', 'UNKNOWN') or isinstance(status, Exception):
+                print(f"The search of request {rid} ended with status {status!r}")
+                end(index, None)
+        fetched = await asyncio.gather(*(loop.run_in_executor(None, _fetch_matches, rid, filenames[index],
+                                                              file_type, keep_files, per_query)
+                                         for index, rid in ready), return_exceptions=True)
+        for (index, rid), list_matches in zip(ready, fetched):
+            if isinstance(list_matches, Exception):
+                print(f"The results of request {rid} could not be read: {list_matches!r}")
+                list_matches = None
+            end(index, list_matches)
+    return [results[index] for index in range(len(orfs))]
+
+
+def _blast_batched(orfs: list, filename: str, program: str, database: str, filters: str, email: str, file_type: str,
+                   keep_files: bool, concurrent: bool, submit_interval: float, poll_interval: float,
+                   max_queries: int = BATCH_QUERIES, max_letters: int = BATCH_LETTERS, progress=None) -> list:
+
+    """Submit sequences packed in multi-FASTA batches, one request ID per batch, and demultiplex the hits.
+
+    :param orfs: list.
+        -sequences to be aligned.
+    :param filename: str.
+        -file where the results will be stored, prefixed by the batch number.
+    :param concurrent: bool.
+        -If True the batches are submitted and polled together with asyncio, else one after another.
+    :param max_queries: int.
+        -maximum number of sequences of a batch (default is 10).
+    :param max_letters: int.
+        -maximum number of residues of a batch (default is 5000).
+    :param progress: callable.
+        -called with the number of sequences done whenever the search of a batch ends (default is None).
+    :return: list.
+        -list of the predicted proteins (accession IDs) of every sequence, None if the search of its batch failed
+        or its hits could not be told apart from the others.
+    """
+    batches = _fasta_batches(orfs, max_queries, max_letters)
+    queries = [_multi_fasta(orfs, batch) for batch in batches]
+    filenames = ["batch" + str(b + 1) + "_" + filename for b in range(len(batches))]
+    done = 0
+
+    def batch_done(b: int) -> None:
+        nonlocal done
+        done += len(batches[b])
+        if progress is not None:
+            progress(done)
+
+    if concurrent:
+        per_batch = asyncio.run(_blast_concurrent(queries, filenames, program, database, filters, email, file_type,
+                                                  keep_files, submit_interval, poll_interval, per_query=True,
+                                                  progress=batch_done))
+    else:
+        per_batch = []
+        for b, query in enumerate(queries):
+            if b:
+                time.sleep(submit_interval)
+            p = query_Blast(query, program, database, filters, email)
+            rid = extract_attribute(p, RID)
+            if not rid or _get_client().wait(rid, extract_attribute(p, RTOE), poll_interval) != 'READY':
+                per_batch.append(None)
+            else:
+                per_batch.append(_fetch_matches(rid, filenames[b], file_type, keep_files, per_query=True))
+            batch_done(b)
+    results = [None] * len(orfs)
+    for batch, dict_matches in zip(batches, per_batch):
+        if dict_matches is None:  # the search of the batch failed
+            continue
+        for i in batch:
+            results[i] = dict_matches.get("query" + str(i))  # a query without hits has an empty list
+    return results
+
+
 def Blast_orfs(OrfList:list, filename:str="temporary", program:str = Program, database: str = Database_PDB,
-               filters: str = "", email: str = "", file_type="html", keep_files=True):
+               filters: str = "", email: str = "", file_type="html", keep_files=True, cache=True,
+               concurrent=False, submit_interval: float = None, poll_interval: float = POLL_INTERVAL,
+               batched=False, max_queries: int = BATCH_QUERIES, max_letters: int = BATCH_LETTERS, progress=None):
 
     """Given a list of orfs it blasts them against pdb database and return a dictionary with the orf as key and the list of
     alignments as value
@@ -282,31 +848,88 @@ def Blast_orfs(OrfList:list, filename:str="temporary", program:str = Program, da
     :param filename: str.
         -file where the results will be stored if keep_file is in default mode.
     param keep_files: bool
-        -If False will erase the saved file results, else it will keep them
-    :return: str.
-        -query which will be submitted to blast server.
+        -If False the results are only parsed in memory, else they are also saved in a file
+    :param cache: bool or BlastCache.
+        -cache of hits keyed by sequence and parameters, cached ORFs are not submitted again
+        (default is True, the cache in DATA_CACHE).
+    :param concurrent: bool.
+        -If True all ORFs are submitted spaced by submit_interval and polled together with asyncio,
+        else they are searched one after another (default is False).
+    :param submit_interval: float.
+        -minimum time between two submissions in seconds (default is None, the interval of the backend: 10 for
+        the NCBI server and 0 for local backends).
+    :param poll_interval: float.
+        -maximum time between two status checks in seconds (default is 60).
+    :param batched: bool.
+        -If True the ORFs are packed in multi-FASTA batches submitted as one request each and the hits are
+        demultiplexed per ORF (default is False).
+    :param max_queries: int.
+        -maximum number of ORFs of a batch (default is 10).
+    :param max_letters: int.
+        -maximum number of residues of a batch (default is 5000).
+    :param progress: callable.
+        -called with the number of distinct ORFs done and their total whenever ORFs are done (default is None).
+    :return: dict.
+        -list of the predicted proteins (accession IDs) of every ORF, None if its search failed. Failed searches
+        are not cached.
     """
+    cache = _get_cache(cache)
+    total = len(set(OrfList))
+    if submit_interval is None:
+        submit_interval = _get_client().submit_interval
     n = 0
+    submitted = False  # the next sequential submission waits submit_interval
     dict_matches = {}
+    queries = {}  # ORFs to submit with their file names
     for orf in OrfList:
         n += 1
+        if orf in dict_matches or orf in queries:  # identical ORFs are submitted once
+            continue
+        if cache is not None:
+            list_matches = cache.get(_cache_key(orf, program, database, filters, file_type))
+            if list_matches is not None:
+                print("The results are already in the cache")
+                dict_matches[orf] = list_matches
+                if progress is not None:
+                    progress(len(dict_matches), total)
+                continue
         file_name = "orf" + str(n) + "_" + filename
-        file_path=os.path.join(DATA_CACHE, file_name)
-        if os.path.isfile(file_path + ".html") or os.path.isfile(file_path + ".zip"):
-            print ("The results are already in the folder")
-            if file_type == "html":
-                path = file_path + ".html"
-                list_matches =html_reader(path)
-            else:
-                path = file_path + ".zip"
-                list_matches = zip_reader(path)
-            if keep_files is False:  # delete the result files
-                os.remove(path)
-        else:
-            list_matches = Blast_sequence(orf, filename=file_name, program=program, database=database, filters=filters,
-                                      email=email, file_type=file_type, keep_files=keep_files)
+        if concurrent or batched:
+            queries[orf] = file_name
+            continue
+        if submitted:
+            time.sleep(submit_interval)
+        submitted = True
+        list_matches = Blast_sequence(orf, filename=file_name, program=program, database=database, filters=filters,
+                                      email=email, file_type=file_type, keep_files=keep_files, cache=cache)
         dict_matches[orf] = list_matches
-        time.sleep(10)  # Do not contact the server more often than once every 10 seconds.
+        if progress is not None:
+            progress(len(dict_matches), total)
+
+    if queries:
+        orfs = list(queries)
+
+        def searches_done(done: int) -> None:  # done: number of searched ORFs
+            if progress is not None:
+                progress(len(dict_matches) + done, total)
+
+        if batched:
+            results = _blast_batched(orfs, filename, program, database, filters, email, file_type, keep_files,
+                                     concurrent, submit_interval, poll_interval, max_queries, max_letters,
+                                     progress=searches_done)
+        else:
+            ended = itertools.count(1)
+            results = asyncio.run(_blast_concurrent(orfs, [queries[orf] for orf in orfs], program, database,
+                                                    filters, email, file_type, keep_files, submit_interval,
+                                                    poll_interval, progress=lambda index: searches_done(next(ended))))
+        for orf, list_matches in zip(orfs, results):
+            if cache is not None and list_matches is not None:  # failed searches are not cached
+                cache.put(_cache_key(orf, program, database, filters, file_type), list_matches)
+        dict_matches.update(zip(orfs, results))
+        dict_matches = {orf: dict_matches[orf] for orf in OrfList}  # in order of the ORFs
+    failed = [orf for orf, list_matches in dict_matches.items() if list_matches is None]
+    if failed:
+        print(f"The search of {len(failed)} of {total} sequences failed, they can be submitted again")
     print("The job is complete for all the sequences!")
     return dict_matches
 
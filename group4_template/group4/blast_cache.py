@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from group4.utils import DATA_CACHE
+
+
+class BlastCache:
+
+    """Persistent cache of BLAST hits, keyed by a hash of the query instead of its position in a list of ORFs.
+
+    Entries are stored in a SQLite database which may be shared by several processes: every operation uses its own
+    connection and writes are serialized by SQLite. Entries older than the time to live are dropped, and when the
+    cache holds more than max_entries the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = os.path.join(DATA_CACHE, "blast_cache.sqlite"), ttl: float = None,
+                 max_entries: int = None):
+
+        """
+        :param path: str.
+            -path of the SQLite database (default is "blast_cache.sqlite" in DATA_CACHE).
+        :param ttl: float.
+            -time to live of an entry in seconds (default is None, entries never expire).
+        :param max_entries: int.
+            -maximum number of entries kept (default is None, no limit).
+        """
+        if max_entries is not None and not max_entries >= 1:
+            raise AssertionError('Maximum number of entries should be greater than or equal to 1')
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS hits (key TEXT PRIMARY KEY, matches TEXT NOT NULL, "
+                         "created REAL NOT NULL, accessed REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS hits_accessed ON hits (accessed)")
+
+    @contextmanager
+    def _connect(self):
+
+        """Open a connection which waits for writes of other processes instead of failing.
+        The transaction is committed (or rolled back on errors) and the connection closed on exit.
+
+        :return: sqlite3.Connection.
+            -connection to the cache database.
+        """
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")  # readers do not block the writer
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def key(seq: str, program: str, database: str, filters: str = "", file_type: str = "html", source: str = "") -> str:
+
+        """Hash the parameters which determine the hits of a query.
+
+        :param seq: str.
+            -aminoacidic sequence to be aligned.
+        :param program: str.
+            -program used to blast (e.g. "PROGRAM=blastp&").
+        :param database: str.
+            -database used in the blast (e.g. "DATABASE=pdb").
+        :param filters: str.
+            -filters added to the put query (e.g "&THRESHOLD=13).
+        :param file_type: str.
+            -format of the results the hits are read from ("html" or "json").
+        :param source: str.
+            -backend answering the query, empty for the NCBI server (e.g. "local:/path/pdb_seqres.txt").
+        :return: str.
+            -sha256 hex digest of the parameters.
+        """
+        fields = [seq.strip().upper(), program, database, filters, file_type]
+        if source:
+            fields.append(source)
+        return hashlib.sha256("\0".join(fields).encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+
+        """Return the hits stored for a key, or None if there are none or they expired.
+
+        :param key: str.
+            -key of the query, see BlastCache.key.
+        :return: list or None.
+            -list of the predicted proteins (accession IDs).
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT matches, created FROM hits WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM hits WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE hits SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key: str, matches: list) -> None:
+
+        """Store the hits of a query and evict expired and least recently used entries.
+
+        :param key: str.
+            -key of the query, see BlastCache.key.
+        :param matches: list.
+            -list of the predicted proteins (accession IDs).
+        :return: None.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO hits VALUES (?, ?, ?, ?)", (key, json.dumps(matches), now, now))
+            if self.ttl is not None:
+                conn.execute("DELETE FROM hits WHERE created < ?", (now - self.ttl,))
+            if self.max_entries is not None:
+                conn.execute("DELETE FROM hits WHERE key NOT IN "
+                             "(SELECT key FROM hits ORDER BY accessed DESC LIMIT ?)", (self.max_entries,))
+        return
+
+    def clear(self) -> None:
+
+        """Delete all entries of the cache.
+
+        :return: None.
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM hits")
+        return
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM hits").fetchone()[0]
@@ -2,7 +2,9 @@
 
 from group4.sequence_assembly import MSA, Assembly
 from group4.gene_finder import Transcribe, Translate
-from group4.Blast import Blast_orfs
+from group4.Blast import Blast_orfs, set_backend
+from group4.local_blast import LocalSearch, LocalClient, LocalBlastServer
+from group4.protein_index import ProteinIndex
 
 import click
 
@@ -16,16 +18,18 @@ def protein_prediction():
 @click.argument('sequence1')
 @click.argument('sequence2')
 @click.option('-p', '--show', is_flag=True, default=False, help='Option to print output')
-def pw_alignment(sequence1, sequence2, show):
+@click.option('-b', '--band', type=int, default=None, help='Half width of the diagonal band around the seeded overlap')
+def pw_alignment(sequence1, sequence2, show, band):
     """
     Performs pairwise local alignment of given sequences.
     Args:
         sequence1: (str) sequence 1
         sequence2: (str) sequence 2
         show: (bool) option to print output to standout
+        band: (int) half width of the diagonal band around the seeded overlap
 
     """
-    obj = MSA()
+    obj = MSA(band=band)
     obj.pairwise_alignment(seq1=sequence1, seq2=sequence2, print_output=show)
     return None
 
@@ -34,16 +38,40 @@ def pw_alignment(sequence1, sequence2, show):
 @click.argument('sequences', type=click.Path(exists=True))
 @click.option('-o', '--output', default=None, help='Option to store output')
 @click.option('-p', '--show', is_flag=True, default=False, help='Option to print output')
-def assemble_seq(sequences, output, show):
+@click.option('-v', '--overlap', type=click.Choice(['alignment', 'exact']), default='alignment',
+              help='Find overlaps by local alignment or by exact suffix-prefix matching')
+@click.option('-m', '--min_overlap', type=int, default=3, help='Minimum length of exact overlaps')
+@click.option('-e', '--engine', type=click.Choice(['greedy', 'dbg']), default='greedy',
+              help='Assemble with the greedy algorithm or a De Bruijn graph')
+@click.option('-k', '--kmer', type=int, default=None, help='Length of k-mers in the De Bruijn graph')
+@click.option('-j', '--jobs', type=int, default=1, help='Number of processes aligning reads')
+@click.option('-c', '--chunk_size', type=int, default=None, help='Number of alignments per task of a process')
+@click.option('--packed', is_flag=True, default=False, help='Hold reads with 2 bits per base')
+@click.option('-b', '--band', type=int, default=None, help='Half width of the diagonal band around the seeded overlap')
+@click.option('-s', '--score_only', is_flag=True, default=False,
+              help='Rank pairs by alignment score and trace back only the best pair')
+def assemble_seq(sequences, output, show, overlap, min_overlap, engine, kmer, jobs, chunk_size, packed, band,
+                 score_only):
     """
     Performs De Novo sequence assembly
     Args:
         sequences: (str) input file with sequences
         output: (str) output to output file
         show: (bool) option to print output to standout
+        overlap: (str) overlap mode, 'alignment' or 'exact'
+        min_overlap: (int) minimum length of exact overlaps
+        engine: (str) assembly engine, 'greedy' or 'dbg'
+        kmer: (int) length of k-mers in the De Bruijn graph
+        jobs: (int) number of processes aligning reads
+        chunk_size: (int) number of alignments per task of a process
+        packed: (bool) option to hold reads with 2 bits per base
+        band: (int) half width of the diagonal band around the seeded overlap
+        score_only: (bool) option to rank pairs by alignment score and trace back only the best pair
 
     """
-    obj = Assembly(sequences=sequences, output_path=output)
+    obj = Assembly(sequences=sequences, output_path=output, overlap=overlap, min_overlap=min_overlap,
+                   engine=engine, k=kmer, jobs=jobs, chunk_size=chunk_size, packed=packed, band=band,
+                   score_only=score_only)
     seq = obj.assembled_sequence
     if show is True:
         click.echo(seq)
@@ -56,7 +84,10 @@ def assemble_seq(sequences, output, show):
 @click.option('-t', '--threshold', type=int, default=20, help='Threshold for amino-acid sequence length')
 @click.option('-o', '--output', default=None, help='Option to store output')
 @click.option('-p', '--show', is_flag=True, default=False, help='Option to print output')
-def transcription(dna_sequence, reverse, threshold, output, show):
+@click.option('-l', '--lean', is_flag=True, default=False, help='Splice genes from the dna without mRNA copies')
+@click.option('-j', '--jobs', type=int, default=1, help='Number of processes scanning the six frames')
+@click.option('-c', '--chunk_size', type=int, default=None, help='Number of bases per scanning task of a process')
+def transcription(dna_sequence, reverse, threshold, output, show, lean, jobs, chunk_size):
     """
     Performs process of transcription on a given dna sequence.
     Args:
@@ -65,9 +96,13 @@ def transcription(dna_sequence, reverse, threshold, output, show):
         threshold: (int) minimum length of amino-acid sequence (excluding start and stop codon)
         output: (str) output to output file
         show: (bool) option to print output to standout
+        lean: (bool) option to splice genes from the dna without mRNA copies
+        jobs: (int) number of processes scanning the six frames
+        chunk_size: (int) number of bases per scanning task of a process
 
     """
-    obj = Transcribe(dna=dna_sequence, reverse=reverse, threshold=threshold, output_path=output)
+    obj = Transcribe(dna=dna_sequence, reverse=reverse, threshold=threshold, output_path=output, lean=lean,
+                     jobs=jobs, chunk_size=chunk_size)
     genes_table = obj.genes_data
 
     if show is True:
@@ -80,7 +115,10 @@ def transcription(dna_sequence, reverse, threshold, output, show):
 @click.option('-t', '--threshold', type=int, default=20, help='Threshold for aminoacid sequence length')
 @click.option('-o', '--output', default=None, help='Option to store output')
 @click.option('-p', '--show', is_flag=True, default=False, help='Option to print output')
-def translation(dna_sequence, reverse, threshold, output, show):
+@click.option('-l', '--lean', is_flag=True, default=False, help='Splice genes from the dna without mRNA copies')
+@click.option('-j', '--jobs', type=int, default=1, help='Number of processes scanning the six frames')
+@click.option('-c', '--chunk_size', type=int, default=None, help='Number of bases per scanning task of a process')
+def translation(dna_sequence, reverse, threshold, output, show, lean, jobs, chunk_size):
     """
     Performs process of translation on a given dna sequence.
     Args:
@@ -89,9 +127,13 @@ def translation(dna_sequence, reverse, threshold, output, show):
         threshold: (int) minimum length of amino-acid sequence (excluding start and stop codon)
         output: (str) output to output file
         show: (bool) option to print output to standout
+        lean: (bool) option to splice genes from the dna without mRNA copies
+        jobs: (int) number of processes scanning the six frames
+        chunk_size: (int) number of bases per scanning task of a process
 
     """
-    obj = Translate(dna=dna_sequence, reverse=reverse, threshold=threshold, output_path=output)
+    obj = Translate(dna=dna_sequence, reverse=reverse, threshold=threshold, output_path=output, lean=lean,
+                    jobs=jobs, chunk_size=chunk_size)
     protein_table = obj.proteins_table
 
     if show is True:
@@ -108,7 +150,14 @@ def translation(dna_sequence, reverse, threshold, output, show):
 @click.option('-fi', '--email', default="", help="can add personal email for contact purposes")
 @click.option('-t', '--file_type', default="html",
               help="Decide in which format to save the results.Allowed format are html or zip")
-def predict(orflist, filename, program, database, filters, email, file_type, keep_files):
+@click.option('-c', '--concurrent', is_flag=True, default=False,
+              help="Submit all sequences spaced by 10 seconds and poll them together")
+@click.option('--batched', is_flag=True, default=False,
+              help="Submit the sequences in multi-FASTA batches, one request per batch")
+@click.option('--local_db', type=click.Path(exists=True), default=None,
+              help="Search a local protein FASTA file or index instead of the BLAST server")
+def predict(orflist, filename, program, database, filters, email, file_type, keep_files, concurrent, batched,
+            local_db):
     """
     Given a list of orfs it blasts them against pdb database and return a dictionary with the orf as key and the list of
     alignments as value.
@@ -117,9 +166,15 @@ def predict(orflist, filename, program, database, filters, email, file_type, kee
         filename: (str) file where the results will be stored if keep_file is in default mode
         file_type: (str) type of file to save
         keep_files: (bool) If False will erase the saved file results, else it will keep them
+        concurrent: (bool) option to submit all sequences before polling them together
+        batched: (bool) option to submit the sequences in multi-FASTA batches
+        local_db: (str) protein FASTA file or index directory searched offline instead of the BLAST server
 
     """
-    list_results = Blast_orfs(orflist, filename, program, database, filters, email, file_type, keep_files)
+    if local_db is not None:
+        set_backend(LocalClient(LocalSearch(local_db)))
+    list_results = Blast_orfs(orflist, filename, program, database, filters, email, file_type, keep_files,
+                              concurrent=concurrent, batched=batched)
     print(list_results)
 
 
@@ -136,7 +191,14 @@ def predict(orflist, filename, program, database, filters, email, file_type, kee
 @click.option('-d', '--database', default="DATABASE=pdb", help="Select the database (e.g. 'DATABASE=refseq'")
 @click.option('-fi', '--filters', default="", help="can add filters to the blast aligment (e.g. '&THRESHOLD=13'")
 @click.option('-fi', '--email', default="", help="can add personal email for contact purposes")
-def predict_pro(sequences, reverse, threshold, show, output, filename, program, database, filters, email, file_type, keep_files):
+@click.option('-c', '--concurrent', is_flag=True, default=False,
+              help="Submit all sequences spaced by 10 seconds and poll them together")
+@click.option('--batched', is_flag=True, default=False,
+              help="Submit the sequences in multi-FASTA batches, one request per batch")
+@click.option('--local_db', type=click.Path(exists=True), default=None,
+              help="Search a local protein FASTA file or index instead of the BLAST server")
+def predict_pro(sequences, reverse, threshold, show, output, filename, program, database, filters, email, file_type, keep_files,
+                concurrent, batched, local_db):
     """
     Performs Likelihood Protein Identification via k-mer Genetic Sequence Assembly.
     Args:
@@ -148,13 +210,19 @@ def predict_pro(sequences, reverse, threshold, show, output, filename, program,
         filename: (str) file where the results will be stored if keep_file is in default mode
         file_type: (str) format type of file
         keep_files: (bool) If False will erase the saved file results, else it will keep them
+        concurrent: (bool) option to submit all sequences before polling them together
+        batched: (bool) option to submit the sequences in multi-FASTA batches
+        local_db: (str) protein FASTA file or index directory searched offline instead of the BLAST server
 
     """
+    if local_db is not None:
+        set_backend(LocalClient(LocalSearch(local_db)))
     assembled_dna = Assembly(sequences=sequences).assembled_sequence
     obj = Translate(dna=assembled_dna, reverse=reverse, threshold=threshold)
     protein_list = obj.proteins
     protein_table = obj.proteins_table
-    protein_dict = Blast_orfs(protein_list, filename,program, database, filters, email, file_type, keep_files)
+    protein_dict = Blast_orfs(protein_list, filename,program, database, filters, email, file_type, keep_files,
+                              concurrent=concurrent, batched=batched)
     protein_table['predicted_proteins'] = protein_table['amino_acid_sequence'].apply(lambda x: protein_dict[x])
     if show is True:
         click.echo(f'Assembled sequence : \n {assembled_dna}\n')
@@ -174,5 +242,76 @@ def predict_pro(sequences, reverse, threshold, show, output, filename, program,
             raise ValueError(f'Format "{file_format}" is not supported (supported formats: csv, tsv, txt)')
 
 
+@protein_prediction.command('blast_server')
+@click.argument('fasta', type=click.Path(exists=True))
+@click.option('-h', '--host', default='127.0.0.1', help='Host name of the server')
+@click.option('-p', '--port', type=int, default=8000, help='Port of the server')
+def blast_server(fasta, host, port):
+    """
+    Runs a local stand-in of the BLAST server which searches a protein FASTA file.
+    Set GROUP4_BLAST_URL to the printed url to use it in predict and predict_pro.
+    Args:
+        fasta: (str) reference protein FASTA file (e.g. a PDB seqres dump) or index directory
+        host: (str) host name of the server
+        port: (int) port of the server
+
+    """
+    server = LocalBlastServer(LocalSearch(fasta), host=host, port=port)
+    click.echo(f'Serving {fasta} at {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@protein_prediction.group('index')
+def index():
+    """
+    Builds and queries k-mer indexes of reference proteins for offline prediction.
+    """
+    pass
+
+
+@index.command('build')
+@click.argument('fasta', type=click.Path(exists=True))
+@click.option('-o', '--output', default=None, help='Directory of the index, default the FASTA path with ".index"')
+@click.option('-k', '--kmer', type=int, default=3, help='Length of the indexed k-mers')
+def index_build(fasta, output, kmer):
+    """
+    Builds a memory-mappable k-mer index of a protein FASTA file.
+    Args:
+        fasta: (str) reference protein FASTA file (e.g. a PDB seqres dump)
+        output: (str) directory of the index
+        kmer: (int) length of the indexed k-mers
+
+    """
+    if output is None:
+        output = fasta + '.index'
+    obj = ProteinIndex.build(fasta, k=kmer)
+    obj.save(output)
+    click.echo(f'Indexed {len(obj)} proteins and {len(obj.postings_protein)} k-mers in {output}')
+
+
+@index.command('query')
+@click.argument('index_path', type=click.Path(exists=True))
+@click.argument('sequence')
+@click.option('-a', '--align', is_flag=True, default=False, help='Align the candidates and keep the hits')
+def index_query(index_path, sequence, align):
+    """
+    Prints the accessions of the proteins matching an amino-acid sequence.
+    Args:
+        index_path: (str) directory of the index
+        sequence: (str) amino-acid sequence
+        align: (bool) option to align the candidates instead of ranking them by seeds only
+
+    """
+    if align:
+        click.echo(LocalSearch(index_path).accession_list(sequence))
+    else:
+        click.echo(ProteinIndex.load(index_path).query(sequence))
+
+
 if __name__ == '__main__':
     protein_prediction()
@@ -1,30 +1,207 @@
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+import math
+import numpy as np
 import pandas as pd
 from group4.constants import *
 
+# lookup table from ascii values to base codes in order of 'ACGU', 4 for any other character
+_BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate('ACGU'):
+    _BASE_CODES[ord(_base)] = _code
+# same codes for dna, where T takes the place of U
+_DNA_CODES = _BASE_CODES.copy()
+_DNA_CODES[ord('T')] = _BASE_CODES[ord('U')]
+# codes of complementary bases, A-U and C-G
+_COMPLEMENT_CODES = np.array([3, 2, 1, 0, 4], dtype=np.uint8)
+
+# byte translations of dna to forward and reverse strand mrna (the reverse strand is read backwards)
+_FORWARD_MRNA = bytes.maketrans(b'T', b'U')
+_REVERSE_MRNA = bytes.maketrans(b'ACGT', b'UGCA')
+
+
+def _codon_index(codon: str) -> int:
+    """ Returns the index of a codon in the 64 codons ordered by bases 'ACGU'. """
+    return sum(int(_BASE_CODES[ord(base)]) << shift for base, shift in zip(codon, (4, 2, 0)))
+
+
+START_CODON = _codon_index('AUG')
+STOP_CODONS = [_codon_index(codon) for codon in ['UAA', 'UAG', 'UGA']]
+
+
+def _frame_codons(codes: np.ndarray, strand: str, frame: int, start: int, stop: int) -> tuple:
+    """
+    Finds start and stop codons of one frame within a chunk of a strand, in a process pool worker.
+    Codons starting before stop may read 2 bases past the chunk.
+    Args:
+        codes: (np.ndarray) dna base codes of the forward strand
+        strand: (str) 'forward' or 'reverse'
+        frame: (int) frame 0, 1 or 2
+        start: (int) first position of the chunk on the strand
+        stop: (int) position after the chunk
+
+    Returns:
+        tuple(np.ndarray, np.ndarray) positions of start and stop codons on the strand
+
+    """
+    size = len(codes)
+    first = start + (frame - start) % 3  # first position of the frame in the chunk
+    if strand == 'forward':
+        bases = codes[first: stop + 2].copy()
+    else:  # complementary codes read backwards
+        bases = _COMPLEMENT_CODES[codes[max(0, size - stop - 2): max(0, size - first)][::-1]]
+
+    count = len(bases) // 3
+    codon_bases = bases[:count * 3].reshape(count, 3).astype(np.int16)
+    codons = (codon_bases[:, 0] << 4) | (codon_bases[:, 1] << 2) | codon_bases[:, 2]
+    codons[(codon_bases > 3).any(axis=1)] = 64
+    positions = first + 3 * np.arange(count)
+    return positions[codons == START_CODON], positions[np.isin(codons, STOP_CODONS)]
+
+
+def _scan_frame(name: str, size: int, strand: str, frame: int, start: int, stop: int) -> tuple:
+    """
+    Finds start and stop codons of one frame within a chunk of a strand, reading the dna base codes from shared
+    memory (see _frame_codons).
+    Args:
+        name: (str) name of the shared memory block of the dna base codes
+        size: (int) number of bases
+        strand: (str) 'forward' or 'reverse'
+        frame: (int) frame 0, 1 or 2
+        start: (int) first position of the chunk on the strand
+        stop: (int) position after the chunk
+
+    Returns:
+        tuple(np.ndarray, np.ndarray) positions of start and stop codons on the strand
+
+    """
+    from multiprocessing import shared_memory
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        codes = np.ndarray((size,), dtype=np.uint8, buffer=block.buf)
+        result = _frame_codons(codes, strand, frame, start, stop)  # copies the bases it reads
+        del codes  # the shared buffer can only be closed without views on it
+    finally:
+        block.close()
+    return result
+
+
+class _LazyProperty:
+    """ Property computed on first access and then cached in the instance, like functools.cached_property. """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name] = self.func(obj)  # the instance attribute hides the property from now on
+        return value
+
+
+class LazyGenes(Mapping):
+    """
+    Gene sequences of one strand by their positions, spliced from the dna bytes only when a sequence is accessed.
+    Behaves like the dict of positions to mRNA sequences built by Transcribe.gene_sequences.
+    """
+
+    def __init__(self, bases: bytes, strand: str, positions: list):
+        self.bases = bases  # upper case dna
+        self.strand = strand
+        self.positions = list(positions)
+        self._positions = set(self.positions)
+
+    def __getitem__(self, position: tuple) -> str:
+        if position not in self._positions:
+            raise KeyError(position)
+        start, end = position
+        if self.strand == 'forward':
+            return self.bases[start: end].translate(_FORWARD_MRNA).decode('ascii')
+        size = len(self.bases)  # positions on the reverse strand count from the end of the dna
+        return self.bases[size - end: size - start].translate(_REVERSE_MRNA)[::-1].decode('ascii')
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __repr__(self) -> str:
+        return f'LazyGenes({self.strand!r}, {self.positions!r})'
 
-class Transcribe:
-    """ Class for performing transcription process on a dna sequence """
 
-    def __init__(self, dna: str, reverse: bool = True, threshold: int = 20, output_path: str = None):
+class Transcribe:
+    """
+    Class for performing transcription process on a dna sequence.
+    The strands, genes and their dataframe are computed on first access and cached.
+    """
+
+    def __init__(self, dna: str, reverse: bool = True, threshold: int = 20, output_path: str = None,
+                 vectorized: bool = True, lean: bool = False, jobs: int = 1, chunk_size: int = None,
+                 columnar: bool = False):
         if '.' in dna:
             self._check_input_path(dna)
             self.dna = self._read_dna_file(dna)
         else:
             self.dna = dna
+        if not threshold >= 1:
+            raise AssertionError('Threshold should be greater than or equal to 1')
         self.reverse = reverse
         self.threshold = threshold
-
-        self.cdna = self.complementary_dna(self.dna)  # Complementary dna strand
-        self.f_mrna = self.transcribe(self.dna)  # Forward strand mrna
-        self.r_mrna = self.transcribe(self.cdna)  # Reverse strand mrna
-
-        self.genes = self.gene_sequences()
-        self.genes_data = self.__genes_data()
+        self.vectorized = vectorized
+        self.lean = lean  # strands are read from one byte buffer, genes are spliced when accessed
+        if not jobs >= 1:
+            raise AssertionError('Number of jobs should be greater than or equal to 1')
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        self.columnar = columnar  # tables with categorical strand and integer start, end instead of position strings
 
         if output_path is not None:
             self._check_path(output_path)
             self.store_genes(path=output_path)
 
+    @_LazyProperty
+    def cdna(self) -> str:
+        """ Complementary dna strand """
+        return self.complementary_dna(self.dna)
+
+    @_LazyProperty
+    def f_mrna(self) -> str:
+        """ Forward strand mrna """
+        return self.transcribe(self.dna)
+
+    @_LazyProperty
+    def r_mrna(self) -> str:
+        """ Reverse strand mrna """
+        return self.transcribe(self.cdna)
+
+    @_LazyProperty
+    def _bases(self) -> bytes:
+        """ Upper case dna bytes read in lean mode """
+        return self.dna.upper().encode('ascii')
+
+    @_LazyProperty
+    def genes(self) -> dict:
+        """ Spliced exon sequences with positions on corresponding strand """
+        return self.gene_sequences()
+
+    @_LazyProperty
+    def genes_data(self) -> pd.DataFrame:
+        """ Dataframe of spliced exons """
+        return self.__genes_data()
+
+    @_LazyProperty
+    def spans(self) -> list:
+        """ (strand, start, end) of all genes in the order of genes_data """
+        spans = [('forward', start, end) for start, end in self.genes['forward']]
+        if self.reverse is True:
+            spans.extend(('reverse', start, end) for start, end in self.genes['reverse'])
+        return spans
+
     @staticmethod
     def _check_input_path(path: str) -> None:
         """
@@ -62,12 +239,13 @@ class Transcribe:
             path: (str) path to output file
 
         Raises:
-            ValueError if output file format not in ['txt', 'csv', 'tsv']
+            ValueError if output file format not in ['txt', 'csv', 'tsv', 'parquet', 'feather']
 
         """
         file_format = path.split('.')[-1]
-        if file_format not in ['txt', 'csv', 'tsv']:
-            raise ValueError(f'Format "{file_format}" is not supported for output (supported formats: txt, csv, tsv)')
+        if file_format not in ['txt', 'csv', 'tsv', 'parquet', 'feather']:
+            raise ValueError(f'Format "{file_format}" is not supported for output '
+                             f'(supported formats: txt, csv, tsv, parquet, feather)')
 
     @staticmethod
     def complementary_dna(dna_seq: str) -> str:
@@ -96,16 +274,92 @@ class Transcribe:
         return dna_seq.upper().replace("T", "U")
 
     @staticmethod
-    def gene_finder(mrna: str) -> set:
+    def _codon_sites(mrna: str) -> np.ndarray:
+        """
+        Encodes the codon starting at every position of the mRNA as its index in the 64 codons.
+        Args:
+            mrna: (str) mRNA strand
+
+        Returns:
+            (np.ndarray) codon index of positions 0 to len(mrna) - 3, 64 for codons with other bases than ACGU
+
+        """
+        return Transcribe._codons(_BASE_CODES[np.frombuffer(mrna.encode('ascii', errors='replace'), dtype=np.uint8)])
+
+    @staticmethod
+    def _codons(codes: np.ndarray) -> np.ndarray:
+        """
+        Encodes the codon starting at every position of a sequence of base codes as its index in the 64 codons.
+        Args:
+            codes: (np.ndarray) base codes in order of 'ACGU', 4 for other characters
+
+        Returns:
+            (np.ndarray) codon index of positions 0 to len(codes) - 3, 64 for codons with other bases than ACGU
+
+        """
+        if len(codes) < 3:
+            return np.zeros(0, dtype=np.int16)
+        first, second, third = codes[:-2], codes[1:-1], codes[2:]
+        codons = (first.astype(np.int16) << 4) | (second.astype(np.int16) << 2) | third
+        codons[(first | second | third) > 3] = 64
+        return codons
+
+    @staticmethod
+    def _pair_orfs(starts: np.ndarray, stops: np.ndarray) -> tuple:
+        """
+        Pairs start codons with the next stop codon of the same frame, keeping the first start of every stop.
+        Args:
+            starts: (np.ndarray) sorted positions of start codons in one frame
+            stops: (np.ndarray) sorted positions of stop codons in the same frame
+
+        Returns:
+            tuple(np.ndarray, np.ndarray) start and end positions of the longest coding sequence of every stop codon
+
+        """
+        next_stop = np.searchsorted(stops, starts)
+        closed = next_stop < len(stops)  # start codons without a stop codon downstream are dropped
+        starts, ends = starts[closed], stops[next_stop[closed]] + 3
+        first = np.ones(len(ends), dtype=bool)
+        first[1:] = ends[1:] != ends[:-1]
+        return starts[first], ends[first]
+
+    @staticmethod
+    def _find_orfs(codons: np.ndarray) -> set:
+        """
+        Finds positions of the longest protein coding sequences in each ORF from the codons at every position.
+        Args:
+            codons: (np.ndarray) codon indices as returned by _codons
+
+        Returns:
+            all_positions: (set[tuple]) tuples of coding sequence positions, in the order of gene_finder
+
+        """
+        start_sites = np.flatnonzero(codons == START_CODON)
+        stop_sites = np.flatnonzero(np.isin(codons, STOP_CODONS))
+        all_positions = set()
+        for n in range(3):  # same insertion order as the codon by codon scan
+            in_frame_starts = start_sites[start_sites % 3 == n]
+            starts, ends = Transcribe._pair_orfs(in_frame_starts, stop_sites[stop_sites % 3 == n])
+            all_positions.update(zip(starts.tolist(), ends.tolist()))
+        return all_positions
+
+    @staticmethod
+    def gene_finder(mrna: str, vectorized: bool = True) -> set:
         """
         Finds positions of the longest protein coding sequences in each open reading frame (ORF).
+        The vectorized engine encodes all codons at once and maps every start codon to the next stop codon of its
+        frame by binary search, the other engine scans the frames codon by codon.
         Args:
             mrna: (str) mRNA strand
+            vectorized: (bool) option to use the vectorized engine. Default True
 
         Returns:
             all_positions: (set[tuple]) tuples of coding sequence positions on given sequence for each ORF.
 
         """
+        if vectorized is True:
+            return Transcribe._find_orfs(Transcribe._codon_sites(mrna))
+
         all_positions = set()
         for n in range(3):
             frame = mrna[n:]
@@ -142,10 +396,61 @@ class Transcribe:
             raise AssertionError('Threshold should be greater than or equal to 1')
         return list(filter(lambda x: abs(x[1] - x[0]) >= int(threshold + 2) * 3, positions))
 
+    def _parallel_orfs(self) -> tuple:
+        """
+        Scans the frames of both strands in chunks on a process pool and pairs the codons of each frame afterwards.
+        The dna base codes are shared with the workers through shared memory instead of being pickled for every task,
+        before Python 3.8 (no multiprocessing.shared_memory) they are pickled for every task instead.
+        ORFs crossing chunk borders are found since start and stop codons are paired over the whole strand.
+
+        Returns:
+            tuple(set[tuple], set[tuple]) positions of coding sequences on the forward and the reverse strand
+
+        """
+        try:
+            from multiprocessing import shared_memory
+        except ImportError:  # Python 3.7
+            shared_memory = None
+
+        codes = _DNA_CODES[np.frombuffer(self._bases, dtype=np.uint8)]
+        size = len(codes)
+        chunk_size = self.chunk_size or max(1, math.ceil(size / self.jobs))
+        strands = ['forward', 'reverse'] if self.reverse is True else ['forward']
+        tasks = [(strand, frame, start, min(start + chunk_size, size))
+                 for strand in strands for frame in range(3) for start in range(0, size, chunk_size)]
+
+        if shared_memory is None:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                futures = [executor.submit(_frame_codons, codes, *task) for task in tasks]
+                results = [future.result() for future in futures]
+        else:
+            block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            try:
+                np.ndarray((size,), dtype=np.uint8, buffer=block.buf)[:] = codes
+                with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                    futures = [executor.submit(_scan_frame, block.name, size, *task) for task in tasks]
+                    results = [future.result() for future in futures]
+            finally:
+                block.close()
+                block.unlink()
+
+        positions = {strand: set() for strand in ['forward', 'reverse']}
+        for strand in strands:
+            for frame in range(3):  # same insertion order as gene_finder
+                scans = [result for task, result in zip(tasks, results) if task[:2] == (strand, frame)]
+                if not scans:
+                    continue
+                starts = np.concatenate([scan[0] for scan in scans])
+                stops = np.concatenate([scan[1] for scan in scans])
+                orf_starts, orf_ends = self._pair_orfs(starts, stops)
+                positions[strand].update(zip(orf_starts.tolist(), orf_ends.tolist()))
+        return positions['forward'], positions['reverse']
+
     def gene_sequences(self, print_output: bool = False) -> dict:
         """
         Performs exon splicing. Extracts coding sequences from mRNA strand
         The function returns list of all the ORF sequences.
+        In lean mode the sequences are spliced from the dna bytes when they are accessed.
         Args:
             print_output: (bool) option to print formatted output. Default False
 
@@ -153,17 +458,32 @@ class Transcribe:
             genes: (dict) spliced exon sequences with positions on corresponding strand
 
         """
-        # find position of genes
-        gene_pos_dna = self.gene_finder(self.f_mrna)
-        gene_pos_cdna = self.gene_finder(self.r_mrna)
+        # find position of genes, the reverse strand is only read if it is used
+        if self.jobs > 1:
+            gene_pos_dna, gene_pos_cdna = self._parallel_orfs()
+        elif self.lean is True:  # codons of the reverse strand are read backwards from the complementary codes
+            codes = _DNA_CODES[np.frombuffer(self._bases, dtype=np.uint8)]
+            gene_pos_dna = self._find_orfs(self._codons(codes))
+            gene_pos_cdna = set()
+            if self.reverse is True:
+                gene_pos_cdna = self._find_orfs(self._codons(_COMPLEMENT_CODES[codes[::-1]]))
+        else:
+            gene_pos_dna = self.gene_finder(self.f_mrna, vectorized=self.vectorized)
+            gene_pos_cdna = set()
+            if self.reverse is True:
+                gene_pos_cdna = self.gene_finder(self.r_mrna, vectorized=self.vectorized)
 
         # filter out short sequences
         gene_pos_dna = self._filter_sequence(gene_pos_dna, self.threshold)
         gene_pos_cdna = self._filter_sequence(gene_pos_cdna, self.threshold)
 
         # splice the genes
-        genes_dna = {(start, end): self.f_mrna[start: end] for start, end in gene_pos_dna}
-        genes_cdna = {(start, end): self.r_mrna[start: end] for start, end in gene_pos_cdna}
+        if self.lean is True:
+            genes_dna = LazyGenes(self._bases, 'forward', gene_pos_dna)
+            genes_cdna = LazyGenes(self._bases, 'reverse', gene_pos_cdna)
+        else:
+            genes_dna = {(start, end): self.f_mrna[start: end] for start, end in gene_pos_dna}
+            genes_cdna = {(start, end): self.r_mrna[start: end] for start, end in gene_pos_cdna}
 
         genes = {'forward': None, 'reverse': None}
 
@@ -187,6 +507,9 @@ class Transcribe:
 
     def __genes_data(self):
         """ Returns pandas dataframe with spliced exons information """
+        if self.columnar is True:
+            return self._columnar_genes_data()
+
         genes_data = pd.DataFrame(columns=['strand', 'position', 'mrna'])
 
         strand = ['forward' for _ in range(len(self.genes['forward']))]
@@ -209,6 +532,81 @@ class Transcribe:
 
         return genes_data
 
+    def _columnar_genes_data(self) -> pd.DataFrame:
+        """
+        Builds the dataframe of spliced exons from pre-sized arrays.
+        Returns:
+            (pd.DataFrame) categorical strand, integer start and end and mrna columns
+
+        """
+        strands = [strand for strand in ['forward', 'reverse'] if self.genes[strand] is not None]
+        counts = [len(self.genes[strand]) for strand in strands]
+        positions = np.zeros((sum(counts), 2), dtype=np.int64)
+        mrnas = np.empty(sum(counts), dtype=object)
+        offset = 0
+        for strand, count in zip(strands, counts):
+            genes = self.genes[strand]
+            positions[offset: offset + count] = np.fromiter((pos for position in genes for pos in position),
+                                                            dtype=np.int64, count=2 * count).reshape(count, 2)
+            mrnas[offset: offset + count] = list(genes.values())
+            offset += count
+
+        codes = np.repeat(np.arange(len(counts), dtype=np.int8), counts)
+        return pd.DataFrame({'strand': pd.Categorical.from_codes(codes, categories=['forward', 'reverse']),
+                             'start': positions[:, 0],
+                             'end': positions[:, 1],
+                             'mrna': mrnas})
+
+    def _columnar(self, table: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts a genes or proteins table for columnar files.
+        The strand becomes a categorical (dictionary encoded) column and positions integer start and end columns.
+        Args:
+            table: (pd.DataFrame) table with strand and 'start-end' position columns, rows in the order of spans
+
+        Returns:
+            (pd.DataFrame) table with strand, start and end columns followed by the other columns of the table
+
+        """
+        if 'position' not in table.columns:  # built by the columnar option
+            return table
+        strands, starts, ends = zip(*self.spans) if self.spans else ((), (), ())
+        columns = {'strand': pd.Categorical(strands, categories=['forward', 'reverse']),
+                   'start': np.array(starts, dtype=np.int64),
+                   'end': np.array(ends, dtype=np.int64)}
+        for column in table.columns.drop(['strand', 'position']):
+            columns[column] = table[column].to_numpy()
+        return pd.DataFrame(columns)
+
+    @staticmethod
+    def load_table(path: str, arrow: bool = False):
+        """
+        Reads a genes or proteins table stored in parquet or feather format, memory-mapping the file.
+        Needs the optional dependency pyarrow.
+        Args:
+            path: (str) path to parquet or feather file
+            arrow: (bool) option to return the pyarrow Table, which shares memory with the file. Default False
+
+        Returns:
+            (pd.DataFrame|pyarrow.Table) table with strand, start and end columns followed by the sequence columns
+
+        Raises:
+            ValueError if file format not in ['parquet', 'feather']
+
+        """
+        file_format = path.split('.')[-1]
+        if file_format not in ['parquet', 'feather']:
+            raise ValueError(f'Format "{file_format}" is not supported for input (supported formats: parquet, feather)')
+
+        import pyarrow.feather
+        import pyarrow.parquet
+
+        if file_format == 'parquet':
+            table = pyarrow.parquet.read_table(path, memory_map=True)
+        else:
+            table = pyarrow.feather.read_table(path, memory_map=True)
+        return table if arrow is True else table.to_pandas()
+
     def store_genes(self, path: str) -> None:
         """
         Writes spliced exon information in output file
@@ -216,7 +614,7 @@ class Transcribe:
             path: (str) path to output path
 
         Raises:
-            ValueError if output file format not in ['txt', 'csv', 'tsv']
+            ValueError if output file format not in ['txt', 'csv', 'tsv', 'parquet', 'feather']
 
         """
         file_format = path.split('.')[-1]
@@ -227,8 +625,13 @@ class Transcribe:
             self.genes_data.to_csv(path, sep='\t', header=False, index=False)
         elif file_format == 'txt':
             self.genes_data.to_csv(path, sep=' ', header=False, index=False)
+        elif file_format == 'parquet':
+            self._columnar(self.genes_data).to_parquet(path, index=False)
+        elif file_format == 'feather':
+            self._columnar(self.genes_data).to_feather(path)
         else:
-            raise ValueError(f'Format "{file_format}" is not supported (supported formats: csv, tsv, txt)')
+            raise ValueError(f'Format "{file_format}" is not supported '
+                             f'(supported formats: csv, tsv, txt, parquet, feather)')
 
         return None
 
@@ -236,13 +639,13 @@ class Transcribe:
 class Translate(Transcribe):
     """ Class to translate mRNA sequence to amino-acid sequence."""
 
-    def __init__(self, dna: str = None, reverse: bool = True, threshold: int = 20, output_path: str = None):
+    def __init__(self, dna: str = None, reverse: bool = True, threshold: int = 20, output_path: str = None,
+                 vectorized: bool = True, lean: bool = False, jobs: int = 1, chunk_size: int = None,
+                 columnar: bool = False):
         self.codon_table = codon_table
 
-        super().__init__(dna=dna, reverse=reverse, threshold=threshold)
-        self.proteins = None
-        self.proteins_table = None
-        self._translation()  # perform translation of all mrna sequences
+        super().__init__(dna=dna, reverse=reverse, threshold=threshold, vectorized=vectorized, lean=lean,
+                         jobs=jobs, chunk_size=chunk_size, columnar=columnar)
         if output_path is not None:
             self._check_path(output_path)
             self.store_proteins(path=output_path)
@@ -268,11 +671,71 @@ class Translate(Transcribe):
                 protein += self.codon_table[codon]
         return protein
 
-    def _translation(self):
-        """ Wrapper function to perform translation of orf genes. """
-        self.genes_data['amino_acid_sequence'] = self.genes_data.apply(lambda x: self.translate(x.mrna), axis=1)
-        self.proteins = list(self.genes_data['amino_acid_sequence'])
-        self.proteins_table = self.genes_data.drop(columns='mrna')
+    def _amino_acid_table(self) -> np.ndarray:
+        """
+        Builds a lookup table from codon indices to amino-acid characters.
+        Returns:
+            (np.ndarray) uint8 characters of the 64 codons, 0 for the start codon and 'X' (index 64) for unknown codons
+
+        """
+        table = np.full(65, ord('X'), dtype=np.uint8)
+        for codon, amino_acid in self.codon_table.items():
+            table[_codon_index(codon)] = ord(amino_acid)
+        table[START_CODON] = 0  # start codons are excluded from amino-acid sequences
+        return table
+
+    def translate_batch(self, mrnas: list) -> list:
+        """
+        Translates many mRNA sequences at once through a lookup table of the 64 codons.
+        Start codons are excluded and each sequence stops at its first stop codon like in translate,
+        codons with unknown bases are translated to 'X' and an incomplete last codon is ignored.
+        Args:
+            mrnas: (list[str]) mRNA sequences
+
+        Returns:
+            (list[str]) amino-acid sequences
+
+        """
+        if len(mrnas) == 0:
+            return []
+        lengths = np.array([len(mrna) for mrna in mrnas], dtype=np.int64)
+        n_codons = lengths // 3
+        offsets = np.cumsum(lengths) - lengths  # position of every sequence in the joined sequences
+        first_codon = np.cumsum(n_codons) - n_codons  # index of the first codon of every sequence
+
+        # positions of all complete codons in the joined sequences
+        sequence = np.repeat(np.arange(len(mrnas)), n_codons)
+        positions = (np.arange(n_codons.sum()) - first_codon[sequence]) * 3 + offsets[sequence]
+        codons = self._codon_sites(''.join(mrnas))[positions]
+
+        amino_acids = self._amino_acid_table()[codons]
+        stops = np.cumsum(amino_acids == ord('*'))
+        stops_before = np.concatenate([[0], stops])[first_codon][sequence]  # stop codons in previous sequences
+        keep = (stops == stops_before) & (amino_acids != 0)  # before the first stop codon, without start codons
+
+        protein_lengths = np.bincount(sequence[keep], minlength=len(mrnas))
+        text = amino_acids[keep].tobytes().decode('ascii')
+        ends = np.cumsum(protein_lengths).tolist()
+        return [text[end - length: end] for end, length in zip(ends, protein_lengths.tolist())]
+
+    @_LazyProperty
+    def proteins(self) -> list:
+        """ Amino-acid sequences of all genes in the order of genes_data, translated without the dataframe """
+        mrnas = list(self.genes['forward'].values())
+        if self.reverse is True:
+            mrnas.extend(self.genes['reverse'].values())
+        return self.translate_batch(mrnas)
+
+    @_LazyProperty
+    def proteins_table(self) -> pd.DataFrame:
+        """ Dataframe of amino-acid sequences with their strand and position, genes_data gets the same column """
+        if self.columnar is True:  # the columns are shared with genes_data instead of copied
+            proteins = np.array(self.proteins, dtype=object)
+            self.genes_data['amino_acid_sequence'] = proteins
+            columns = {column: self.genes_data[column] for column in ['strand', 'start', 'end']}
+            return pd.DataFrame(dict(columns, amino_acid_sequence=proteins), copy=False)
+        self.genes_data['amino_acid_sequence'] = self.proteins
+        return self.genes_data.drop(columns='mrna')
 
     def store_proteins(self, path: str) -> None:
         """
@@ -281,7 +744,7 @@ class Translate(Transcribe):
             path: (str) path to output path
 
         Raises:
-            ValueError if output file format not in ['txt', 'csv', 'tsv']
+            ValueError if output file format not in ['txt', 'csv', 'tsv', 'parquet', 'feather']
 
         """
         file_format = path.split('.')[-1]
@@ -292,7 +755,12 @@ class Translate(Transcribe):
             self.proteins_table.to_csv(path, sep='\t', header=False, index=False)
         elif file_format == 'txt':
             self.proteins_table.to_csv(path, sep=' ', header=False, index=False)
+        elif file_format == 'parquet':
+            self._columnar(self.proteins_table).to_parquet(path, index=False)
+        elif file_format == 'feather':
+            self._columnar(self.proteins_table).to_feather(path)
         else:
-            raise ValueError(f'Format "{file_format}" is not supported (supported formats: csv, tsv, txt)')
+            raise ValueError(f'Format "{file_format}" is not supported '
+                             f'(supported formats: csv, tsv, txt, parquet, feather)')
 
         return None
@@ -0,0 +1,227 @@
+""" Background jobs running the protein prediction pipeline for the web application. """
+
+from group4.sequence_assembly import Assembly
+from group4.gene_finder import Translate
+from group4.Blast import Blast_orfs
+from group4.utils import DATA_CACHE
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import traceback
+import uuid
+
+JOBS_DIR = os.path.join(DATA_CACHE, 'jobs')
+
+# time in seconds a job directory is kept after its last status update
+RETENTION = 7 * 24 * 3600
+
+# steps of the pipeline, reported as progress
+STEPS = ['Assembling reads', 'Translating the assembled sequence', 'Predicting proteins', 'Done']
+
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _write_json(path: str, data: dict) -> None:
+    """ Writes a json file atomically, so readers in other processes never see a partial file. """
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+
+def update_status(job_dir: str, **fields) -> dict:
+    """
+    Updates the status file of a job.
+    Args:
+        job_dir: (str) directory of the job
+        **fields: fields of the status to replace, e.g. status='running'
+
+    Returns:
+        (dict) status of the job
+
+    """
+    path = os.path.join(job_dir, 'status.json')
+    status = {}
+    if os.path.exists(path):
+        with open(path, 'r') as file:
+            status = json.load(file)
+    status.update(fields)
+    _write_json(path, status)
+    return status
+
+
+def run_pipeline(job_dir: str, sequences_path: str) -> None:
+    """
+    Assembles the reads of a file, translates the assembled sequence and predicts the proteins of its ORFs,
+    reporting the progress in the status file of the job. Runs in a worker of the job queue.
+    Args:
+        job_dir: (str) directory of the job, receives status.json, result.json and table.html
+        sequences_path: (str) path to the uploaded txt, fasta or fastq file
+
+    """
+    def step(index: int, detail: str = '') -> None:
+        update_status(job_dir, status='running', step=index + 1, steps=len(STEPS), progress=STEPS[index],
+                      detail=detail)
+
+    try:
+        step(0)
+        assembled = Assembly(sequences=sequences_path).assembled_sequence
+        step(1)
+        obj = Translate(dna=assembled)
+        proteins = obj.proteins
+        with open(os.path.join(job_dir, 'ORFList.txt'), 'w') as file:
+            file.write(str(proteins))
+        step(2, f'0 of {len(set(proteins))} ORFs')
+        final_dict = Blast_orfs(proteins, progress=lambda done, total: step(2, f'{done} of {total} ORFs'))
+        table = obj.proteins_table
+        table['predicted_proteins'] = table['amino_acid_sequence'].apply(lambda x: final_dict[x])
+        with open(os.path.join(job_dir, 'table.html'), 'w') as file:
+            file.write(table.to_html(classes='data', header=True))
+        _write_json(os.path.join(job_dir, 'result.json'),
+                    {'assembled': assembled, 'f_mrna': ''.join(obj.f_mrna), 'r_mrna': ''.join(obj.r_mrna)})
+        update_status(job_dir, status='done', step=len(STEPS), progress=STEPS[-1], detail='')
+    except Exception as error:
+        update_status(job_dir, status='failed', error=f'{type(error).__name__}: {error}',
+                      traceback=traceback.format_exc())
+
+
+class JobQueue:
+    """
+    Queue of pipeline jobs executed by a pool of worker processes. If processes can not be started, the jobs run on
+    threads of the web server process instead, so no external service is needed either way.
+    The status of every job is kept in a file of its directory, which any process can read. Directories of jobs
+    whose status did not change for retention seconds are removed by cleanup.
+    """
+
+    def __init__(self, jobs_dir: str = JOBS_DIR, workers: int = 2, processes: bool = True,
+                 retention: float = RETENTION):
+        if not workers >= 1:
+            raise AssertionError('Number of workers should be greater than or equal to 1')
+        self.jobs_dir = jobs_dir
+        self.workers = workers
+        self.retention = retention
+        self.executor = None
+        self._lock = threading.Lock()
+        os.makedirs(jobs_dir, exist_ok=True)
+        if processes:
+            try:
+                self.executor = ProcessPoolExecutor(max_workers=workers)
+            except (OSError, NotImplementedError, ImportError):  # e.g. no semaphores on the platform
+                self.executor = None
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    @property
+    def in_process(self) -> bool:
+        """ Returns True if the jobs run on threads of this process. """
+        return isinstance(self.executor, ThreadPoolExecutor)
+
+    def job_dir(self, job_id: str):
+        """ Returns the directory of a job, None for ids which are not job ids. """
+        if not _JOB_ID.match(job_id):
+            return None
+        return os.path.join(self.jobs_dir, job_id)
+
+    def submit(self, sequences_path: str, move: bool = False) -> str:
+        """
+        Enqueues the pipeline for an uploaded file.
+        Args:
+            sequences_path: (str) path to the uploaded txt, fasta or fastq file
+            move: (bool) option to move the file into the directory of the job, so it is removed with the job
+
+        Returns:
+            (str) id of the job
+
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = self.job_dir(job_id)
+        os.makedirs(job_dir)
+        if move:
+            sequences_path = shutil.move(sequences_path, os.path.join(job_dir, os.path.basename(sequences_path)))
+        update_status(job_dir, status='queued', step=0, steps=len(STEPS), progress='Waiting for a worker',
+                      detail='', filename=os.path.basename(sequences_path))
+        with self._lock:
+            try:
+                future = self.executor.submit(run_pipeline, job_dir, sequences_path)
+            except (BrokenProcessPool, OSError, RuntimeError):  # worker processes can not be started
+                self.executor = ThreadPoolExecutor(max_workers=self.workers)
+                future = self.executor.submit(run_pipeline, job_dir, sequences_path)
+        future.add_done_callback(lambda done: self._check_crash(job_dir, done))
+        return job_id
+
+    @staticmethod
+    def _check_crash(job_dir: str, future) -> None:
+        """ Marks a job as failed if its worker died before it could report it. """
+        error = future.exception()
+        if error is not None:
+            update_status(job_dir, status='failed', error=f'{type(error).__name__}: {error}')
+
+    def status(self, job_id: str):
+        """
+        Reads the status of a job.
+        Args:
+            job_id: (str) id of the job
+
+        Returns:
+            (dict) status, progress, step and steps of the job, None if there is no such job
+
+        """
+        job_dir = self.job_dir(job_id)
+        if job_dir is None or not os.path.exists(os.path.join(job_dir, 'status.json')):
+            return None
+        with open(os.path.join(job_dir, 'status.json'), 'r') as file:
+            return json.load(file)
+
+    def result(self, job_id: str):
+        """
+        Reads the result of a finished job.
+        Args:
+            job_id: (str) id of the job
+
+        Returns:
+            (dict) assembled sequence, forward and reverse mRNA and the html table of the predicted proteins,
+            None if the job is not done
+
+        """
+        status = self.status(job_id)
+        if status is None or status['status'] != 'done':
+            return None
+        job_dir = self.job_dir(job_id)
+        with open(os.path.join(job_dir, 'result.json'), 'r') as file:
+            result = json.load(file)
+        with open(os.path.join(job_dir, 'table.html'), 'r') as file:
+            result['table'] = file.read()
+        return result
+
+    def cleanup(self) -> list:
+        """
+        Removes the directories of the jobs whose status did not change for retention seconds, with their
+        results and moved uploads. Jobs still running update their status, so only finished or lost jobs expire.
+
+        Returns:
+            (list) ids of the removed jobs
+
+        """
+        removed = []
+        now = time.time()
+        for job_id in os.listdir(self.jobs_dir):
+            job_dir = self.job_dir(job_id)
+            if job_dir is None or not os.path.isdir(job_dir):
+                continue
+            path = os.path.join(job_dir, 'status.json')
+            updated = os.path.getmtime(path if os.path.exists(path) else job_dir)
+            if now - updated > self.retention:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                removed.append(job_id)
+        return removed
+
+    def shutdown(self, wait: bool = True) -> None:
+        """ Stops the workers after the queued jobs. """
+        self.executor.shutdown(wait=wait)
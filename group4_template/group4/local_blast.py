@@ -0,0 +1,322 @@
+""" Offline protein search and a local stand-in of the BLAST URL API. """
+
+from group4.constants import amino_acids, blosum62, gap_penalty
+from group4.sequence_assembly import MSA
+from group4.protein_index import ProteinIndex, accession, encode_protein
+from group4.utils import PUT_Request, GET_Request, Program, Database_PDB
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import io
+import json
+import os
+import re
+import threading
+import uuid
+import zipfile
+
+import numpy as np
+
+# code separating the targets aligned in one pass, scored so low that no alignment crosses it
+_SEPARATOR = len(amino_acids)
+_SEPARATOR_PENALTY = 1 << 24
+_SUBSTITUTION = np.full((_SEPARATOR + 1, _SEPARATOR + 1), -_SEPARATOR_PENALTY, dtype=np.int64)
+_SUBSTITUTION[:_SEPARATOR, :_SEPARATOR] = np.array(blosum62.split(), dtype=np.int64).reshape(_SEPARATOR, _SEPARATOR)
+
+# version of the search in the key of cached results, raised when the same parameters give other hits
+# (2: candidates by diagonal seed counting in a ProteinIndex)
+SEARCH_VERSION = 2
+
+
+class LocalSearch:
+    """
+    Search of amino-acid sequences against reference proteins (e.g. a PDB seqres dump).
+    Candidate proteins are found by diagonal seed counting in a ProteinIndex and then aligned
+    to the query all at once with a vectorized local alignment.
+    """
+
+    def __init__(self, reference, k: int = 3, min_seeds: int = 2, max_candidates: int = 50, min_score: int = 30):
+        """
+        Args:
+            reference: (str or ProteinIndex) protein FASTA file, directory of an index written by ProteinIndex.save
+                (memory-mapped) or an index
+            k: (int) k-mer length of the index built from a FASTA file. Default 3
+            min_seeds: (int) minimum number of seeds on the best diagonal of a candidate. Default 2
+            max_candidates: (int) maximum number of candidates aligned per query. Default 50
+            min_score: (int) minimum alignment score of a hit. Default 30
+
+        """
+        if not min_seeds >= 1:
+            raise AssertionError('Minimum number of seeds should be greater than or equal to 1')
+        if not max_candidates >= 1:
+            raise AssertionError('Maximum number of candidates should be greater than or equal to 1')
+        if isinstance(reference, ProteinIndex):
+            self.index = reference
+        elif os.path.isdir(reference):
+            self.index = ProteinIndex.load(reference, mmap=True)
+        else:
+            self.index = ProteinIndex.build(reference, k)
+        self.accessions = self.index.accessions
+        self.headers = self.index.headers
+        self.min_seeds = min_seeds
+        self.max_candidates = max_candidates
+        self.min_score = min_score
+        # identifies the backend of cached results, the hits depend on all parameters of the search
+        self.source = (f'{self.index.source}?version={SEARCH_VERSION}&k={self.index.k}&min_seeds={min_seeds}'
+                       f'&max_candidates={max_candidates}&min_score={min_score}')
+
+    def candidates(self, seq: str) -> np.ndarray:
+        """
+        Finds the reference proteins with at least min_seeds k-mers on a diagonal with a sequence.
+        Args:
+            seq: (str) amino-acid sequence
+
+        Returns:
+            (np.ndarray) ids of at most max_candidates proteins, by decreasing number of seeds
+
+        """
+        return self.index.candidates(seq, self.min_seeds, self.max_candidates)[0]
+
+    def scores(self, seq: str, ids) -> np.ndarray:
+        """
+        Finds the local alignment scores of a sequence against reference proteins, aligning all of them in one pass.
+        The proteins are concatenated with separator columns which reset the alignment, so every row of the
+        scoring matrix is filled once with vector operations (see MSA._next_row).
+        Args:
+            seq: (str) amino-acid sequence
+            ids: (iterable) ids of the reference proteins
+
+        Returns:
+            (np.ndarray) BLOSUM62 local alignment score against every protein
+
+        """
+        targets = [self.index.sequence(i) for i in ids]
+        if not targets:
+            return np.zeros(0, dtype=np.int64)
+        codes1 = encode_protein(seq.upper())
+        separator = np.array([_SEPARATOR], dtype=np.uint8)
+        codes2 = np.concatenate([part for target in targets for part in (target, separator)])
+        starts = np.cumsum([0] + [len(target) + 1 for target in targets[:-1]])
+
+        # gap penalty of horizontal steps, crossing a separator costs the separator penalty
+        crossed = np.zeros(len(codes2) + 1, dtype=np.int64)
+        crossed[1:] = codes2 == _SEPARATOR
+        ramp = np.arange(len(codes2) + 1, dtype=np.int64) * gap_penalty - np.cumsum(crossed) * _SEPARATOR_PENALTY
+
+        profile = _SUBSTITUTION[:, codes2]
+        # zero first row and column, so an alignment may start anywhere like in every target after a separator
+        prev, row = np.zeros(len(codes2) + 1, dtype=np.int64), np.zeros(len(codes2) + 1, dtype=np.int64)
+        best = np.zeros(len(codes2) + 1, dtype=np.int64)
+        for i in range(1, len(codes1) + 1):
+            MSA._next_row(prev, row, profile[codes1[i - 1]], ramp)
+            np.maximum(best, row, out=best)
+            prev, row = row, prev
+        return np.maximum.reduceat(best[1:], starts)
+
+    def search(self, seq: str) -> list:
+        """
+        Searches a sequence against the reference proteins.
+        Args:
+            seq: (str) amino-acid sequence
+
+        Returns:
+            (list) tuples of the protein id and the score of the hits with a score of at least min_score,
+            by decreasing score
+
+        """
+        ids = self.candidates(seq)
+        scores = self.scores(seq, ids)
+        order = np.argsort(-scores, kind='stable')
+        return [(int(ids[i]), int(scores[i])) for i in order if scores[i] >= self.min_score]
+
+    def accession_list(self, seq: str) -> list:
+        """ Returns the accessions of the hits of a sequence, like html_reader and zip_reader. """
+        return [self.accessions[protein_id] for protein_id, _ in self.search(seq)]
+
+
+class LocalBlastService:
+    """
+    Answers requests of the BLAST URL API from a local search. A put request (CMD=Put) is searched at once,
+    so the status of its RID (CMD=Get&FORMAT_OBJECT=SearchInfo) is always ready and the results (CMD=Get) are
+    served as html or as zipped JSON2 (FORMAT_TYPE=JSON2). The results of the max_results most recently used
+    RIDs are kept, older RIDs are unknown like expired RIDs of BLAST.
+    """
+
+    def __init__(self, search: LocalSearch, max_results: int = 1000):
+        if not max_results >= 1:
+            raise AssertionError('Maximum number of results should be greater than or equal to 1')
+        self.search = search
+        self.max_results = max_results
+        self.results = OrderedDict()  # RID to the title and the hits of every query, least recently used first
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _queries(text: str) -> list:
+        """ Splits the QUERY of a put request into titles and sequences, a plain sequence has an empty title. """
+        text = text.strip()
+        if not text.startswith('>'):
+            return [('', ''.join(text.split()))]
+        queries = []
+        for record in text[1:].split('\n>'):
+            header, _, seq = record.partition('\n')
+            queries.append((accession(header), ''.join(seq.split())))
+        return queries
+
+    def handle(self, query: str) -> tuple:
+        """
+        Answers a request.
+        Args:
+            query: (str) query string of the request url, e.g. 'CMD=Get&RID=...'
+
+        Returns:
+            tuple(int, str, bytes)
+            status: (int) http status code
+            content_type: (str) content type of the body
+            body: (bytes) body of the response
+
+        """
+        params = {key.upper(): values[-1] for key, values in parse_qs(query, keep_blank_values=True).items()}
+        command = params.get('CMD', '').lower()
+        if command == 'put':
+            return self._put(params.get('QUERY', ''))
+        if command != 'get':
+            return 400, 'text/plain', b'Unknown command'
+        rid = params.get('RID', '')
+        with self._lock:
+            results = self.results.get(rid)
+            if results is not None:
+                self.results.move_to_end(rid)
+        if params.get('FORMAT_OBJECT', '').lower() == 'searchinfo':
+            status = 'UNKNOWN' if results is None else 'READY'
+            return 200, 'text/html', f'QBlastInfoBegin\n    Status={status}\nQBlastInfoEnd\n'.encode()
+        if results is None:
+            return 404, 'text/plain', f'RID {rid} not found'.encode()
+        if params.get('FORMAT_TYPE', '').upper() == 'JSON2':
+            return 200, 'application/zip', self._json2(rid, results)
+        return 200, 'text/html', self._html(results)
+
+    def _put(self, text: str) -> tuple:
+        """ Searches the sequences of a put request and returns its RID. """
+        rid = uuid.uuid4().hex[:11].upper()
+        results = [(title, seq, self.search.search(seq)) for title, seq in self._queries(text)]
+        with self._lock:
+            self.results[rid] = results
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+        return 200, 'text/html', f'QBlastInfoBegin\n    RID = {rid}\n    RTOE = 0\nQBlastInfoEnd\n'.encode()
+
+    def _html(self, results: list) -> bytes:
+        """ Formats results like the html report of BLAST, one table row per hit. """
+        lines = ['<html><body>']
+        for title, _, hits in results:
+            lines.append(f'<b>Query=</b> {title}')
+            lines.append('<table>')
+            for n, (protein_id, score) in enumerate(hits):
+                lines.append(f'<tr id="dtr_{self.search.accessions[protein_id]}" ind="{n}">'
+                             f'<td>{self.search.headers[protein_id]}</td><td>{score}</td></tr>')
+            lines.append('</table>')
+        lines.append('</body></html>')
+        return '\n'.join(lines).encode()
+
+    def _json2(self, rid: str, results: list) -> bytes:
+        """ Formats results like the zipped JSON2 report of BLAST, one file per query. """
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+            files = [f'{rid}_{n + 1}.json' for n in range(len(results))]
+            zf.writestr(f'{rid}.json', json.dumps({'BlastJSON': [{'$ref': name} for name in files]}))
+            for n, (title, seq, hits) in enumerate(results):
+                search = {'query_id': f'Query_{n + 1}', 'query_title': title, 'query_len': len(seq),
+                          'hits': [{'num': i + 1,
+                                    'description': [{'id': self.search.accessions[protein_id],
+                                                     'title': self.search.headers[protein_id]}],
+                                    'hsps': [{'num': 1, 'score': score}]}
+                                   for i, (protein_id, score) in enumerate(hits)]}
+                report = {'program': 'blastp', 'results': {'search': search}}
+                zf.writestr(files[n], json.dumps({'BlastOutput2': {'report': report}}))
+        return buffer.getvalue()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """ Passes the requests of the stand-in server to its service. """
+
+    def _respond(self) -> None:
+        status, content_type, body = self.server.service.handle(urlsplit(self.path).query)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_PUT = do_POST = _respond
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class LocalBlastServer(ThreadingHTTPServer):
+    """ Local http stand-in of the BLAST server, its url may replace the NCBI url (see GROUP4_BLAST_URL). """
+
+    daemon_threads = True
+
+    def __init__(self, search: LocalSearch, host: str = '127.0.0.1', port: int = 0, max_results: int = 1000):
+        super().__init__((host, port), _Handler)
+        self.service = LocalBlastService(search, max_results)
+
+    @property
+    def url(self) -> str:
+        """ Returns the url of the server in the form of utils.URL. """
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/Blast.cgi?'
+
+
+class LocalResponse:
+    """ Response of the in-process backend with the attributes of requests.Response used by the Blast module. """
+
+    def __init__(self, status_code: int, content_type: str, content: bytes):
+        self.status_code = status_code
+        self.headers = {'Content-Type': content_type}
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+
+class LocalClient:
+    """
+    In-process backend with the interface of Blast.BlastClient, answering from a local search without http.
+    Searches are finished when they are submitted, so nothing is spaced out or polled.
+    """
+
+    submit_interval = 0
+
+    def __init__(self, search: LocalSearch):
+        self.service = LocalBlastService(search)
+        self.source = search.source
+
+    def put(self, seq: str, program: str = Program, database: str = Database_PDB, filters: str = "",
+            email: str = "", debug_mode=False) -> LocalResponse:
+        PUT_query = PUT_Request + "QUERY=" + seq + "&" + program + database + filters + email
+        if debug_mode:
+            print(PUT_query)
+        return LocalResponse(*self.service.handle(PUT_query))
+
+    def status(self, rid: str) -> str:
+        response = LocalResponse(*self.service.handle('CMD=Get&FORMAT_OBJECT=SearchInfo&RID=' + rid))
+        return re.search(r'Status=(\w+)', response.text).group(1)
+
+    def results(self, rid: str, response_format: str = "html"):
+        GET_query = GET_Request + "RID=" + rid
+        if response_format == "json":
+            GET_query = GET_query + "&FORMAT_TYPE=JSON2"
+        response = LocalResponse(*self.service.handle(GET_query))
+        return response if response.ok else None
+
+    def wait(self, rid: str, rtoe=None, poll_interval: float = None) -> str:
+        return self.status(rid)
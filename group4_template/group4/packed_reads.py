@@ -0,0 +1,216 @@
+""" Compact storage of nucleotide reads with 2 bits per base. """
+
+from array import array
+
+import os
+import numpy as np
+
+# bases by 2-bit code, the complement of a code c is 3 - c
+BASES = 'ACGT'
+
+_BASE_BYTES = np.frombuffer(BASES.encode('ascii'), dtype=np.uint8)
+_CODES = np.full(256, 255, dtype=np.uint8)  # ascii values to 2-bit codes, 255 for bases that can not be packed
+for _code, _base in enumerate(BASES):
+    _CODES[ord(_base)] = _code
+    _CODES[ord(_base.lower())] = _code
+_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)  # bit position of the 4 bases in a byte
+
+
+def encode(seq: str) -> np.ndarray:
+    """
+    Encodes a nucleotide sequence as 2-bit codes.
+    Args:
+        seq: (str) nucleotide sequence of A, C, G and T
+
+    Returns:
+        (np.ndarray) uint8 codes in order of 'ACGT'
+
+    Raises:
+        ValueError if the sequence contains other characters
+
+    """
+    codes = _CODES[np.frombuffer(seq.encode('ascii', errors='replace'), dtype=np.uint8)]
+    if (codes > 3).any():
+        raise ValueError('Only A, C, G and T can be stored with 2 bits per base')
+    return codes
+
+
+def decode(codes: np.ndarray) -> str:
+    """
+    Decodes 2-bit codes to a nucleotide sequence.
+    Args:
+        codes: (np.ndarray) codes in order of 'ACGT'
+
+    Returns:
+        (str) nucleotide sequence
+
+    """
+    return _BASE_BYTES[codes].tobytes().decode('ascii')
+
+
+def _pack(codes: np.ndarray) -> np.ndarray:
+    """ Packs codes, 4 bases per byte with the first base in the lowest bits. """
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    return np.bitwise_or.reduce(padded.reshape(-1, 4) << _SHIFTS, axis=1).astype(np.uint8)
+
+
+class PackedRead:
+    """ Zero-copy view of a read, a fragment of it or its reverse complement in a PackedReads store. """
+    __slots__ = ('store', 'start', 'length', 'reverse')
+
+    def __init__(self, store: 'PackedReads', start: int, length: int, reverse: bool = False):
+        self.store = store
+        self.start = start  # position of the first base of the forward strand in the store
+        self.length = length
+        self.reverse = reverse
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __str__(self) -> str:
+        return decode(self.codes())
+
+    def __repr__(self) -> str:
+        return f'PackedRead({str(self)!r})'
+
+    def __eq__(self, other) -> bool:
+        return str(self) == str(other)
+
+    def __getitem__(self, key: slice) -> 'PackedRead':
+        start, stop, step = key.indices(self.length)
+        if step != 1:
+            raise ValueError('Only contiguous fragments of a read can be viewed')
+        stop = max(start, stop)
+        if self.reverse:  # fragment of the reverse complement is the reversed fragment of the forward strand
+            return PackedRead(self.store, self.start + self.length - stop, stop - start, reverse=True)
+        return PackedRead(self.store, self.start + start, stop - start)
+
+    def codes(self) -> np.ndarray:
+        """ Returns the 2-bit codes of the viewed bases. """
+        codes = self.store.unpack(self.start, self.start + self.length)
+        return 3 - codes[::-1] if self.reverse else codes
+
+    def reverse_complement(self) -> 'PackedRead':
+        """ Returns a view of the reverse complement. """
+        return PackedRead(self.store, self.start, self.length, reverse=not self.reverse)
+
+
+class PackedReads:
+    """
+    Reads stored with 2 bits per base in one array, together with an index of read offsets.
+    The arrays may be memory-mapped from files written by save.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data  # packed bases, 4 per byte
+        self.offsets = offsets  # base offset of every read and the end of the last read
+
+    @classmethod
+    def from_reads(cls, reads, chunk_size: int = 1 << 22) -> 'PackedReads':
+        """
+        Packs reads in a single pass, buffering at most about chunk_size bases as text.
+        Args:
+            reads: (iterable[str]) nucleotide reads, may be a generator
+            chunk_size: (int) number of bases encoded at once
+
+        Returns:
+            (PackedReads) packed reads
+
+        Raises:
+            ValueError if a read contains other bases than A, C, G and T
+
+        """
+        packed = []  # packed chunks, every chunk holds a multiple of 4 bases
+        offsets = array('q', [0])
+        pending = []  # reads not encoded yet
+        pending_size = 0
+        remainder = np.zeros(0, dtype=np.uint8)  # codes of bases not packed yet
+
+        def flush(last: bool = False) -> np.ndarray:
+            codes = np.concatenate([remainder, encode(''.join(pending))])
+            complete = len(codes) if last else len(codes) // 4 * 4
+            packed.append(_pack(codes[:complete]))
+            pending.clear()
+            return codes[complete:]
+
+        for read in reads:
+            pending.append(read)
+            pending_size += len(read)
+            offsets.append(offsets[-1] + len(read))
+            if pending_size >= chunk_size:
+                remainder = flush()
+                pending_size = 0
+        flush(last=True)
+
+        return cls(np.concatenate(packed), np.frombuffer(offsets, dtype=np.int64).copy())
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'PackedReads':
+        """
+        Loads reads written by save.
+        Args:
+            path: (str) directory of the packed reads
+            mmap: (bool) option to memory-map the arrays instead of reading them. Default True
+
+        Returns:
+            (PackedReads) packed reads
+
+        """
+        mode = 'r' if mmap else None
+        data = np.load(os.path.join(path, 'bases.npy'), mmap_mode=mode)
+        offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode=mode)
+        return cls(data, offsets)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the packed bases and the offsets as NumPy files which can be memory-mapped.
+        Args:
+            path: (str) directory of the packed reads, created if missing
+
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'bases.npy'), self.data)
+        np.save(os.path.join(path, 'offsets.npy'), self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError('Only contiguous ranges of reads can be viewed')
+            return PackedReads(self.data, self.offsets[start: max(start, stop) + 1])
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('read index out of range')
+        start, stop = int(self.offsets[key]), int(self.offsets[key + 1])
+        return PackedRead(self, start, stop - start)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield str(self[i])
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """ Returns the lengths of all reads. """
+        return np.diff(self.offsets)
+
+    def unpack(self, start: int, stop: int) -> np.ndarray:
+        """
+        Unpacks the codes of a range of bases.
+        Args:
+            start: (int) position of the first base
+            stop: (int) position after the last base
+
+        Returns:
+            (np.ndarray) uint8 codes in order of 'ACGT'
+
+        """
+        if stop <= start:
+            return np.zeros(0, dtype=np.uint8)
+        data = np.asarray(self.data[start // 4: (stop + 3) // 4])
+        codes = ((data[:, None] >> _SHIFTS) & 3).ravel()
+        return codes[start % 4: start % 4 + stop - start]
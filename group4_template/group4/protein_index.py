@@ -0,0 +1,211 @@
+""" Memory-mappable k-mer index of reference protein sequences. """
+
+from group4.constants import amino_acids
+from group4.sequence_assembly import FastaTools
+
+import json
+import os
+
+import numpy as np
+
+# lookup table from ascii values to residue codes, unknown characters are encoded as 'X'
+_AMINO_CODES = np.full(256, amino_acids.index('X'), dtype=np.uint8)
+for _code, _residue in enumerate(amino_acids):
+    _AMINO_CODES[ord(_residue)] = _code
+    _AMINO_CODES[ord(_residue.lower())] = _code
+
+# residues which do not seed candidates, k-mers containing them are not indexed
+_UNSEEDED = [amino_acids.index('X'), amino_acids.index('*')]
+
+_ARRAYS = ['kmer_starts', 'postings_protein', 'postings_offset', 'residues', 'seq_starts']
+
+
+def encode_protein(seq: str) -> np.ndarray:
+    """
+    Encodes an amino-acid sequence as an array of integer codes.
+    Args:
+        seq: (str) amino-acid sequence
+
+    Returns:
+        (np.ndarray) uint8 codes in order of amino_acids, 'X' for unknown residues
+
+    """
+    return _AMINO_CODES[np.frombuffer(seq.encode('ascii', errors='replace'), dtype=np.uint8)]
+
+
+def accession(header: str) -> str:
+    """ Returns the accession of a FASTA header, its first word (e.g. '101m_A' for '101m_A mol:protein length:154'). """
+    words = header.split()
+    return words[0] if words else ''
+
+
+def _kmer_codes(codes: np.ndarray, k: int, ends: np.ndarray = None) -> tuple:
+    """
+    Computes the integer codes of the k-mers of encoded residues, skipping k-mers with unseeded residues.
+    Args:
+        codes: (np.ndarray) residue codes
+        k: (int) k-mer length
+        ends: (np.ndarray) end of the sequence of every residue, k-mers may not cross it. Default the end of codes
+
+    Returns:
+        tuple(np.ndarray, np.ndarray)
+        kmers: (np.ndarray) int64 k-mer codes in base len(amino_acids)
+        positions: (np.ndarray) position of the first residue of every k-mer
+
+    """
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    positions = np.arange(n)
+    valid = np.ones(n, dtype=bool) if ends is None else positions + k <= ends[:n]
+    kmers = np.zeros(n, dtype=np.int64)
+    for i in range(k):
+        window = codes[i: i + n]
+        valid &= ~np.isin(window, _UNSEEDED)
+        kmers = kmers * len(amino_acids) + window
+    return kmers[valid], positions[valid]
+
+
+class ProteinIndex:
+    """
+    Inverted index from amino-acid k-mers to their (protein id, offset) postings, together with the residues of the
+    proteins. The postings of a k-mer code c are postings_protein[kmer_starts[c]: kmer_starts[c + 1]] (and the same
+    range of postings_offset), so every array is flat and may be memory-mapped from files written by save.
+    """
+
+    def __init__(self, k: int, kmer_starts: np.ndarray, postings_protein: np.ndarray, postings_offset: np.ndarray,
+                 residues: np.ndarray, seq_starts: np.ndarray, accessions: list, headers: list, fasta: str = ''):
+        self.k = k
+        self.kmer_starts = kmer_starts  # start of the postings of every k-mer code and the end of the last ones
+        self.postings_protein = postings_protein  # int32 protein ids sorted by k-mer code
+        self.postings_offset = postings_offset  # int32 offset of the k-mer in its protein
+        self.residues = residues  # uint8 codes of all proteins
+        self.seq_starts = seq_starts  # start of every protein in residues and the end of the last one
+        self.accessions = accessions
+        self.headers = headers
+        self.fasta = fasta
+        self.source = 'local:' + fasta  # identifies the reference of cached results
+
+    @classmethod
+    def build(cls, fasta: str, k: int = 3) -> 'ProteinIndex':
+        """
+        Indexes the proteins of a FASTA file.
+        Args:
+            fasta: (str) path to the reference protein FASTA file (e.g. a PDB seqres dump), may be compressed
+            k: (int) k-mer length, from 1 to 5. Default 3
+
+        Returns:
+            (ProteinIndex) index of the proteins
+
+        """
+        if not 1 <= k <= 5:
+            raise AssertionError('K-mer length should be greater than or equal to 1 and less than or equal to 5')
+        accessions, headers, sequences = [], [], []
+        for header, seq in FastaTools.iter_fasta_records(fasta):
+            accessions.append(accession(header))
+            headers.append(header)
+            sequences.append(encode_protein(seq.upper()))
+        lengths = np.array([len(seq) for seq in sequences], dtype=np.int64)
+        seq_starts = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        residues = np.concatenate(sequences) if sequences else np.zeros(0, dtype=np.uint8)
+
+        protein_of = np.repeat(np.arange(len(sequences), dtype=np.int32), lengths)
+        kmers, positions = _kmer_codes(residues, k, ends=seq_starts[1:][protein_of])
+        order = np.argsort(kmers, kind='stable')
+        proteins = protein_of[positions[order]]
+        offsets = (positions[order] - seq_starts[proteins]).astype(np.int32)
+        counts = np.bincount(kmers, minlength=len(amino_acids) ** k)
+        kmer_starts = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(k, kmer_starts, proteins, offsets, residues, seq_starts, accessions, headers,
+                   os.path.abspath(fasta))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'ProteinIndex':
+        """
+        Loads an index written by save.
+        Args:
+            path: (str) directory of the index
+            mmap: (bool) option to memory-map the arrays instead of reading them. Default True
+
+        Returns:
+            (ProteinIndex) index of the proteins
+
+        """
+        mode = 'r' if mmap else None
+        arrays = [np.load(os.path.join(path, name + '.npy'), mmap_mode=mode) for name in _ARRAYS]
+        with open(os.path.join(path, 'proteins.json'), 'r') as file:
+            meta = json.load(file)
+        return cls(meta['k'], *arrays, meta['accessions'], meta['headers'], meta['fasta'])
+
+    def save(self, path: str) -> None:
+        """
+        Writes the arrays as NumPy files which can be memory-mapped, and the accessions and headers as json.
+        Args:
+            path: (str) directory of the index, created if missing
+
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(path, name + '.npy'), getattr(self, name))
+        with open(os.path.join(path, 'proteins.json'), 'w') as file:
+            json.dump({'k': self.k, 'fasta': self.fasta, 'accessions': self.accessions, 'headers': self.headers},
+                      file)
+
+    def __len__(self) -> int:
+        return len(self.seq_starts) - 1
+
+    def sequence(self, protein_id: int) -> np.ndarray:
+        """ Returns the residue codes of a protein. """
+        return np.asarray(self.residues[self.seq_starts[protein_id]: self.seq_starts[protein_id + 1]])
+
+    def candidates(self, seq: str, min_seeds: int = 2, max_candidates: int = 50) -> tuple:
+        """
+        Finds the proteins sharing k-mers with a sequence by diagonal seed counting: the postings of the k-mers of
+        the sequence are grouped by protein and diagonal (offset in the protein - position in the sequence), and a
+        protein is scored by its best diagonal.
+        Args:
+            seq: (str) amino-acid sequence
+            min_seeds: (int) minimum number of seeds on the best diagonal. Default 2
+            max_candidates: (int) maximum number of proteins returned. Default 50
+
+        Returns:
+            tuple(np.ndarray, np.ndarray)
+            ids: (np.ndarray) ids of the proteins, by decreasing number of seeds
+            seeds: (np.ndarray) number of seeds on the best diagonal of every protein
+
+        """
+        kmers, positions = _kmer_codes(encode_protein(seq.upper()), self.k)
+        starts = np.asarray(self.kmer_starts[kmers])
+        lengths = np.asarray(self.kmer_starts[kmers + 1]) - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        # gather the postings of all k-mers: the ranges starts[i]:starts[i] + lengths[i] concatenated
+        firsts = np.cumsum(lengths) - lengths
+        index = np.arange(total) + np.repeat(starts - firsts, lengths)
+        proteins = np.asarray(self.postings_protein[index]).astype(np.int64)
+        diagonals = np.asarray(self.postings_offset[index]).astype(np.int64) - np.repeat(positions, lengths)
+
+        keys, seeds = np.unique((proteins << 32) + (diagonals + (1 << 31)), return_counts=True)
+        proteins = keys >> 32
+        groups = np.flatnonzero(np.diff(proteins, prepend=-1))  # first diagonal of every protein
+        ids, seeds = proteins[groups], np.maximum.reduceat(seeds, groups)
+        keep = seeds >= min_seeds
+        ids, seeds = ids[keep], seeds[keep]
+        order = np.argsort(-seeds, kind='stable')[:max_candidates]
+        return ids[order], seeds[order]
+
+    def query(self, seq: str, min_seeds: int = 2, max_candidates: int = 50) -> list:
+        """
+        Finds the candidate hits of a sequence without alignment (see candidates and local_blast.LocalSearch).
+        Args:
+            seq: (str) amino-acid sequence
+            min_seeds: (int) minimum number of seeds on the best diagonal. Default 2
+            max_candidates: (int) maximum number of proteins returned. Default 50
+
+        Returns:
+            (list) accessions of the proteins, like html_reader and zip_reader
+
+        """
+        ids, _ = self.candidates(seq, min_seeds, max_candidates)
+        return [self.accessions[protein_id] for protein_id in ids]
@@ -1,9 +1,329 @@
-from group4.constants import scoring_matrix
+from group4.constants import scoring_matrix, gap_penalty, nucleotides
+from group4.packed_reads import PackedReads, decode
 from itertools import combinations
-from copy import deepcopy
+from functools import partial
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import bz2
+import gzip
+import heapq
+import math
 
 import numpy as np
 
+# lookup table from ascii values to nucleotide codes, unknown characters are encoded as 'N'
+_NUCLEOTIDE_CODES = np.full(256, nucleotides.index('N'), dtype=np.uint8)
+for _code, _base in enumerate(nucleotides):
+    _NUCLEOTIDE_CODES[ord(_base)] = _code
+
+
+# aligner and sequences of a process pool worker, shipped once per worker by _init_worker
+_worker = {}
+
+
+def _init_worker(sequences, options: dict) -> None:
+    """ Stores the sequences and an aligner in a process pool worker. """
+    _worker['msa'] = MSA(**options)
+    _worker['sequences'] = sequences
+
+
+def _align_chunk(pairs: list, score_only: bool = False) -> list:
+    """ Aligns pairs of sequence ids against the sequences stored in the worker. """
+    msa, sequences = _worker['msa'], _worker['sequences']
+    align = msa.score_alignment if score_only else msa.pairwise_alignment
+    return [align(seq1=sequences[i], seq2=sequences[j]) for i, j in pairs]
+
+
+def _align_against(seq2: str, sequences: list, score_only: bool = False) -> list:
+    """ Aligns a chunk of sequences against one sequence in a process pool worker. """
+    msa = _worker['msa']
+    align = msa.score_alignment if score_only else msa.pairwise_alignment
+    return [align(seq1=seq1, seq2=seq2) for seq1 in sequences]
+
+
+class _Reversed:
+    """ Wraps a value to reverse its order, turning the min-heap of heapq into a max-heap. """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+class _Band:
+    """
+    Diagonal band of a local alignment matrix, indexed like the full matrix.
+    Row i holds the columns starts[i] to starts[i] + width - 1, cells outside the band score 0.
+    """
+
+    def __init__(self, scores: np.ndarray, starts: np.ndarray, width: int, m: int):
+        self.scores = scores
+        self.starts = starts
+        self.width = width
+        self.m = m
+
+    def __getitem__(self, index: tuple) -> int:
+        i, j = index
+        k = j - self.starts[i]
+        if 0 <= k < self.width and 0 <= j <= self.m:
+            return self.scores[i, k]
+        if j == 0:
+            return i * gap_penalty
+        if i == 0:
+            return j * gap_penalty
+        return 0
+
+    def best_cell(self) -> tuple:
+        """ Returns the highest score and the first cell holding it in row-major order. """
+        band = self.scores[:, :self.width]
+        flat_index = int(np.argmax(band))
+        score = band.flat[flat_index]
+        if score <= 0:  # cell (0, 0) of the full matrix comes first
+            return max(score, 0), (0, 0)
+        i, k = divmod(flat_index, self.width)
+        return score, (i, self.starts[i] + k)
+
+
+class ContigStore:
+    """ Contigs of an assembly stored by integer id. Ids of removed contigs are reused from a free list. """
+
+    def __init__(self, sequences: list = ()):
+        self.seqs = []  # contig sequences by id, None for free ids
+        self.lengths = np.zeros(max(len(sequences), 16), dtype=np.int64)
+        self.ranks = np.full(len(self.lengths), -1, dtype=np.int64)  # order of insertion, -1 for free ids
+        self.free = []
+        self._next_rank = 0
+        self._size = 0
+        for seq in sequences:
+            self.add(seq)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, contig_id: int) -> bool:
+        return 0 <= contig_id < len(self.seqs) and self.ranks[contig_id] >= 0
+
+    def __getitem__(self, contig_id: int) -> str:
+        return self.seqs[contig_id]
+
+    def add(self, seq: str) -> int:
+        """
+        Stores a contig under a free id.
+        Args:
+            seq: (str) contig sequence
+
+        Returns:
+            (int) id of the contig
+
+        """
+        if self.free:
+            contig_id = self.free.pop()
+            self.seqs[contig_id] = seq
+        else:
+            contig_id = len(self.seqs)
+            self.seqs.append(seq)
+            if contig_id == len(self.lengths):  # grow arrays by doubling
+                self.lengths = np.concatenate([self.lengths, np.zeros_like(self.lengths)])
+                self.ranks = np.concatenate([self.ranks, np.full_like(self.ranks, -1)])
+        self.lengths[contig_id] = len(seq)
+        self.ranks[contig_id] = self._next_rank
+        self._next_rank += 1
+        self._size += 1
+        return contig_id
+
+    def remove(self, contig_id: int) -> str:
+        """
+        Removes a contig and frees its id.
+        Args:
+            contig_id: (int) id of the contig
+
+        Returns:
+            (str) contig sequence
+
+        """
+        seq = self.seqs[contig_id]
+        self.seqs[contig_id] = None
+        self.lengths[contig_id] = 0
+        self.ranks[contig_id] = -1
+        self.free.append(contig_id)
+        self._size -= 1
+        return seq
+
+    def ids(self) -> list:
+        """ Returns the ids of all stored contigs in order of insertion. """
+        live = np.flatnonzero(self.ranks[:len(self.seqs)] >= 0)
+        return [int(contig_id) for contig_id in live[np.argsort(self.ranks[live], kind='stable')]]
+
+
+class DeBruijnGraph:
+    """
+    De Bruijn graph with (k-1)-mers as nodes and the distinct k-mers of reads as edges.
+    K-mers are stored as sorted 64-bit integer codes with 2 bits per base, so k is at most 32.
+    """
+
+    def __init__(self, k: int, chunk_size: int = 1 << 22):
+        if not 2 <= k <= 32:
+            raise AssertionError('k should be between 2 and 32')
+        self.k = k
+        self.chunk_size = chunk_size  # number of bases encoded at once
+        self.kmers = np.zeros(0, dtype=np.uint64)  # sorted distinct k-mer codes
+        self._pending = []  # k-mer codes not merged into self.kmers yet
+        self._pending_size = 0
+
+    @staticmethod
+    def _window_codes(codes: np.ndarray, k: int) -> np.ndarray:
+        """
+        Computes the integer codes of all windows of k bases, doubling the window length in every step.
+        Args:
+            codes: (np.ndarray) nucleotide codes
+            k: (int) window length
+
+        Returns:
+            (np.ndarray) uint64 codes of the len(codes) - k + 1 windows
+
+        """
+        block = (codes & 3).astype(np.uint64)  # codes of windows of `size` bases
+        size = 1
+        windows, width = None, 0  # codes of windows of `width` bases, built from the binary digits of k
+        while True:
+            if k & size:
+                if windows is None:
+                    windows, width = block, size
+                else:
+                    count = len(block) - width
+                    windows = (windows[:count] << np.uint64(2 * size)) | block[width: width + count]
+                    width += size
+            if size << 1 > k:
+                return windows
+            block = (block[:-size] << np.uint64(2 * size)) | block[size:]
+            size <<= 1
+
+    def _add_codes(self, codes: np.ndarray) -> None:
+        """
+        Adds the k-mers of a batch of encoded reads.
+        Args:
+            codes: (np.ndarray) nucleotide codes of the reads separated by an unknown base (code above 3)
+
+        """
+        k = self.k
+        if len(codes) < k:
+            return
+        kmers = self._window_codes(codes, k)
+        unknown = codes > 3
+        if unknown.any():  # drop windows with unknown bases or spanning two reads
+            counts = np.concatenate([[0], np.cumsum(unknown)])
+            kmers = kmers[counts[k:] == counts[:-k]]
+
+        self._pending.append(kmers)
+        self._pending_size += len(kmers)
+        if self._pending_size > max(len(self.kmers), self.chunk_size):  # keep memory close to distinct k-mers
+            self._merge()
+
+    def _merge(self) -> None:
+        """ Merges pending k-mers into the sorted distinct k-mers. """
+        if self._pending:
+            self.kmers = np.unique(np.concatenate([self.kmers] + self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def add_reads(self, reads) -> None:
+        """
+        Adds the k-mers of reads to the graph in a single pass, encoding batches of reads at once.
+        Args:
+            reads: (iterable[str]) kmers/ short reads, may be a generator
+
+        """
+        batch = []
+        size = 0
+        for read in reads:
+            batch.append(read)
+            size += len(read)
+            if size >= self.chunk_size:
+                self._add_batch(batch)
+                batch, size = [], 0
+        self._add_batch(batch)
+
+    def _add_batch(self, reads: list) -> None:
+        """ Encodes a batch of reads and adds their k-mers. """
+        self._add_codes(MSA.encode('N'.join(reads)))
+
+    def add_packed(self, reads: PackedReads) -> None:
+        """
+        Adds the k-mers of packed reads to the graph, unpacking batches of reads without decoding them to text.
+        Args:
+            reads: (PackedReads) packed kmers/ short reads
+
+        """
+        first = 0
+        while first < len(reads):
+            last = int(np.searchsorted(reads.offsets, reads.offsets[first] + self.chunk_size, side='right')) - 1
+            last = min(max(last, first + 1), len(reads))  # at least one read per batch
+            offsets = np.asarray(reads.offsets[first: last + 1], dtype=np.int64)
+            codes = reads.unpack(int(offsets[0]), int(offsets[-1]))
+            self._add_codes(np.insert(codes, offsets[1:-1] - offsets[0], nucleotides.index('N')))
+            first = last
+
+    def _decode(self, code: int, length: int) -> str:
+        """ Decodes an integer k-mer code of given length. """
+        return ''.join(nucleotides[(code >> (2 * (length - 1 - i))) & 3] for i in range(length))
+
+    def contigs(self) -> list:
+        """
+        Spells the graph as Eulerian paths with Hierholzer's algorithm.
+        A graph of error-free reads covering one sequence gives one contig.
+        Returns:
+            (list) sequences of the paths, starting with paths from nodes with more outgoing than incoming edges
+
+        """
+        self._merge()
+        kmers = self.kmers
+        if len(kmers) == 0:
+            return []
+        prefixes = kmers >> np.uint64(2)  # sorted, so the out-edges of a node form a range of edges
+        suffixes = kmers & np.uint64((1 << (2 * (self.k - 1))) - 1)
+        last_bases = (kmers & np.uint64(3)).astype(np.uint8)
+
+        # first out-edge of the node every edge leads to, the extra edge index E for nodes without out-edges
+        next_first = np.searchsorted(prefixes, suffixes, side='left')
+        has_next = next_first < np.searchsorted(prefixes, suffixes, side='right')
+        firsts = np.flatnonzero(np.r_[True, prefixes[1:] != prefixes[:-1]])  # first out-edge of every node
+        lasts = np.r_[firsts[1:], len(kmers)]
+        balance = (lasts - firsts) - np.bincount(next_first[has_next], minlength=len(kmers))[firsts]
+
+        successors = np.where(has_next, next_first, len(kmers)).tolist()
+        ends = np.zeros(len(kmers) + 1, dtype=np.int64)
+        ends[firsts] = lasts
+        ends = ends.tolist()  # end of the out-edge range, at the first out-edge of every node
+        unused = list(range(len(kmers))) + [0]  # next unused out-edge, at the first out-edge of every node
+        starts = np.concatenate([firsts[balance > 0], firsts]).tolist()
+
+        contigs = []
+        for start in starts:
+            if unused[start] == ends[start]:
+                continue
+            nodes = [start]
+            trail = []  # edges leading to the nodes on the stack
+            path = []
+            while nodes:
+                node = nodes[-1]
+                edge = unused[node]
+                if edge < ends[node]:
+                    unused[node] = edge + 1
+                    trail.append(edge)
+                    nodes.append(successors[edge])
+                else:
+                    nodes.pop()
+                    if trail:
+                        path.append(trail.pop())
+            path.reverse()
+            contigs.append(self._decode(int(kmers[path[0]]), self.k) + decode(last_bases[path[1:]]))
+        return contigs
 
 
 class FastaTools:
@@ -11,6 +331,142 @@ class FastaTools:
     def __init__(self):
         pass
 
+    @staticmethod
+    def file_format(filepath: str) -> str:
+        """
+        Returns the format of a file from its extension, ignoring a gz or bz2 compression extension.
+        Args:
+            filepath: (str) path to file
+
+        Returns:
+            (str) file format, e.g. 'fasta' for 'reads.fasta.gz'
+
+        """
+        extensions = filepath.split('.')
+        if extensions[-1] in ['gz', 'bz2'] and len(extensions) > 2:
+            return extensions[-2]
+        return extensions[-1]
+
+    @staticmethod
+    def open_file(filepath: str):
+        """
+        Opens a text file for reading, gzip and bz2 compressed files are decompressed transparently.
+        Args:
+            filepath: (str) path to file
+
+        Returns:
+            (TextIO) buffered text stream
+
+        """
+        if filepath.endswith('.gz'):
+            return gzip.open(filepath, 'rt')
+        elif filepath.endswith('.bz2'):
+            return bz2.open(filepath, 'rt')
+        return open(filepath, 'r')
+
+    @staticmethod
+    def iter_fasta_records(filepath: str):
+        """
+        Reads the header and the sequence of a FASTA file one record at a time.
+        Args:
+            filepath: (str) path to file, may be gzip or bz2 compressed
+
+        Yields:
+            tuple(str, str) header line without '>' and sequence of a record
+
+        """
+        header, seq_lines = None, None  # header and lines of the current record
+        with FastaTools.open_file(filepath) as data:
+            for line in data:
+                if line.startswith('>'):
+                    if seq_lines is not None:
+                        yield header, ''.join(seq_lines)
+                    header, seq_lines = line[1:].strip(), []
+                elif seq_lines is not None:
+                    seq_lines.append(line.strip())
+        if seq_lines is not None:
+            yield header, ''.join(seq_lines)
+
+    @staticmethod
+    def iter_fasta(filepath: str):
+        """
+        Reads the sequences of a FASTA file one record at a time.
+        Args:
+            filepath: (str) path to file, may be gzip or bz2 compressed
+
+        Yields:
+            (str) sequence of a record
+
+        """
+        for _, seq in FastaTools.iter_fasta_records(filepath):
+            yield seq
+
+    @staticmethod
+    def iter_fastq(filepath: str):
+        """
+        Reads the sequences of a FASTQ file one four-line record at a time.
+        Quality lines are skipped by position, so they may start with '@'.
+        Args:
+            filepath: (str) path to file, may be gzip or bz2 compressed
+
+        Yields:
+            (str) sequence of a record
+
+        Raises:
+            ValueError if a record does not start with '@' or is incomplete
+
+        """
+        with FastaTools.open_file(filepath) as data:
+            lines = (line.strip() for line in data)
+            lines = (line for line in lines if line)  # blank lines between records
+            for header in lines:
+                if not header.startswith('@'):
+                    raise ValueError(f'FASTQ record should start with "@", found "{header[:20]}"')
+                record = [next(lines, None) for _ in range(3)]  # sequence, '+' separator, quality
+                if record[-1] is None or not record[1].startswith('+'):
+                    raise ValueError(f'FASTQ record "{header[:20]}" is incomplete')
+                yield record[0]
+
+    @staticmethod
+    def iter_seq_file(file_path: str):
+        """
+        Reads file containing list of nucleotide sequences one sequence at a time
+        Args:
+            file_path: (str) path to txt (one read per line), fasta or fastq file, may be gzip or bz2 compressed
+
+        Yields:
+            (str) sequence
+
+        """
+        file_format = FastaTools.file_format(file_path)
+        if file_format == 'txt':
+            with FastaTools.open_file(file_path) as file:
+                for line in file:
+                    if line.strip():
+                        yield line.strip().upper()
+        elif file_format == 'fasta':
+            yield from FastaTools.iter_fasta(file_path)
+        elif file_format == 'fastq':
+            yield from FastaTools.iter_fastq(file_path)
+
+    @staticmethod
+    def packed_reads(file_path: str, path: str = None) -> PackedReads:
+        """
+        Reads a file of nucleotide sequences in one pass into a store with 2 bits per base.
+        Args:
+            file_path: (str) path to txt, fasta or fastq file, may be gzip or bz2 compressed
+            path: (str) directory to save the packed reads, which are then memory-mapped from it
+
+        Returns:
+            (PackedReads) packed reads
+
+        """
+        reads = PackedReads.from_reads(FastaTools.iter_seq_file(file_path))
+        if path is not None:
+            reads.save(path)
+            reads = PackedReads.load(path, mmap=True)
+        return reads
+
     @staticmethod
     def fasta_list(filepath: str):
         """
@@ -22,14 +478,7 @@ class FastaTools:
             (list) list of sequences
 
         """
-        with open(filepath, 'r') as data:
-            file = data.read()
-            sequences = file.split('>')[1:]
-            list_seqs = []
-            for sequence in sequences:
-                seq = sequence.partition('\n')[2].replace('\n', '')
-                list_seqs.append(seq)
-            return list_seqs
+        return list(FastaTools.iter_fasta(filepath))
 
     @staticmethod
     def fastq_list(filepath: str):
@@ -42,37 +491,67 @@ class FastaTools:
             (list) list of sequences
 
         """
-        with open(filepath, 'r') as data:
-            file = data.read()
-            records = file.split('@')[1:]
-            return [record.split('\n')[1] for record in records]
+        return list(FastaTools.iter_fastq(filepath))
 
 
 class MSA:
     """ Tools for performing sequence alignment. """
 
-    def __init__(self):
+    def __init__(self, kernel: str = 'numpy', band: int = None, seed: int = 8):
+        if kernel not in ['numpy', 'loop']:
+            raise ValueError(f'Kernel "{kernel}" is not supported (supported kernels: numpy, loop)')
+        if band is not None and not band >= 0:
+            raise AssertionError('Band width should be greater than or equal to 0')
+        if not seed >= 1:
+            raise AssertionError('Seed length should be greater than or equal to 1')
+        self.kernel = kernel
+        self.band = band  # half width of the diagonal band, None fills the full matrix
+        self.seed = seed
         self.scoring_matrix = scoring_matrix
+        self.substitution_array = self._substitution_array(scoring_matrix)
 
-    def pairwise_alignment(self, seq1: str, seq2: str, print_output: bool = False) -> tuple:
+    @staticmethod
+    def _substitution_array(matrix: dict) -> np.ndarray:
         """
-        Performs pairwise sequence alignment using local alignment method.
-        Smith-Waterman algorithm is used with some modifications to align identical sequence ends.
+        Converts the scoring matrix to a substitution array indexed by nucleotide codes.
+        Args:
+            matrix: (dict) scores of sorted nucleotide pairs
+
+        Returns:
+            (np.ndarray) 5x5 array of substitution scores in order of 'ACGTN'
+
+        """
+        size = len(nucleotides)
+        sub = np.zeros((size, size), dtype=int)
+        for i in range(size):
+            for j in range(size):
+                sub[i, j] = matrix[''.join(sorted((nucleotides[i], nucleotides[j])))]
+        return sub
+
+    @staticmethod
+    def encode(seq: str) -> np.ndarray:
+        """
+        Encodes a nucleotide sequence as an array of integer codes.
+        Args:
+            seq: (str) nucleotide sequence
+
+        Returns:
+            (np.ndarray) uint8 codes in order of 'ACGTN'
+
+        """
+        return _NUCLEOTIDE_CODES[np.frombuffer(seq.upper().encode('ascii', errors='replace'), dtype=np.uint8)]
+
+    def _fill_matrix_loop(self, seq1: str, seq2: str) -> np.ndarray:
+        """
+        Fills the scoring matrix of the local alignment cell by cell.
         Args:
             seq1: (str) sequence 1
             seq2: (str) sequence 2
-            print_output: (bool) option to print formatted output. Default False
 
         Returns:
-            tuple(int, float, str)
-            alignment_score: (int) highest score of alignmnet
-            seq_identity: (float) percentage of identical matches
-            aligned_seq1: (str) matched fragment on sequence
+            mat: (np.ndarray) (n+1)x(m+1) scoring matrix
 
         """
-        seq1 = seq1.upper()
-        seq2 = seq2.upper()
-
         n = len(seq1)
         m = len(seq2)
 
@@ -91,15 +570,207 @@ class MSA:
                 up = mat[i - 1, j] + -4
                 left = mat[i, j - 1] + -4
                 mat[i, j] = max(diag, up, left, 0)  # replacing all negative values with zero
+        return mat
+
+    def _fill_matrix_numpy(self, seq1: str, seq2: str) -> np.ndarray:
+        """
+        Fills the scoring matrix of the local alignment one row at a time with vector operations.
+        The horizontal gap dependency within a row is resolved with a running maximum.
+        Args:
+            seq1: (str) sequence 1
+            seq2: (str) sequence 2
+
+        Returns:
+            mat: (np.ndarray) (n+1)x(m+1) scoring matrix, identical to the cell by cell result
+
+        """
+        codes1 = self.encode(seq1)
+        codes2 = self.encode(seq2)
+        n = len(codes1)
+        m = len(codes2)
+
+        # INITIALIZE MATRIX
+        ramp = np.arange(m + 1) * gap_penalty  # gap penalty of j horizontal steps
+        mat = np.zeros((n + 1, m + 1), dtype=int)
+        mat[0, :] = ramp
+        mat[:, 0] = np.arange(n + 1) * gap_penalty
+
+        # FILL MATRIX
+        profile = self.substitution_array[:, codes2]  # scores of every base against seq2
+        for i in range(1, n + 1):
+            self._next_row(mat[i - 1], mat[i], profile[codes1[i - 1]], ramp)
+        return mat
+
+    @staticmethod
+    def _next_row(prev: np.ndarray, row: np.ndarray, scores: np.ndarray, ramp: np.ndarray) -> None:
+        """
+        Fills a row of the scoring matrix from the previous row, the first cell of the row is kept.
+        Args:
+            prev: (np.ndarray) previous row
+            row: (np.ndarray) row to fill, starting with its gap penalty
+            scores: (np.ndarray) substitution scores of the base of the row against the other sequence
+            ramp: (np.ndarray) gap penalties of horizontal steps
+
+        """
+        # best of diagonal, up and zero for every cell of the row
+        np.maximum(prev[:-1] + scores, prev[1:] + gap_penalty, out=row[1:])
+        np.maximum(row[1:], 0, out=row[1:])
+        # left moves: mat[i, j] = max over k <= j of row[k] + gap * (j - k)
+        row -= ramp
+        np.maximum.accumulate(row, out=row)
+        row += ramp
+
+    def score_alignment(self, seq1: str, seq2: str) -> tuple:
+        """
+        Finds the local alignment score without traceback, keeping only two rows of the scoring matrix.
+        Within a band (see pairwise_alignment) the band is filled instead.
+        Args:
+            seq1: (str) sequence 1
+            seq2: (str) sequence 2
+
+        Returns:
+            tuple(int, int, int)
+            alignment_score: (int) highest score of the scoring matrix
+            end1: (int) row of the first cell with the highest score, end of the alignment on sequence 1
+            end2: (int) column of that cell, end of the alignment on sequence 2
+
+        """
+        seq1 = seq1.upper()
+        seq2 = seq2.upper()
+        diagonal = self._band_diagonal(seq1, seq2)
+        if diagonal is not None:
+            alignment_score, (i, j) = self._fill_band(seq1, seq2, diagonal).best_cell()
+            return alignment_score, i, j
+
+        codes1 = self.encode(seq1)
+        codes2 = self.encode(seq2)
+        ramp = np.arange(len(codes2) + 1) * gap_penalty
+        profile = self.substitution_array[:, codes2]
+        prev, row = ramp.copy(), np.empty(len(codes2) + 1, dtype=int)
+        alignment_score, end1, end2 = 0, 0, 0  # cell (0, 0) when no score is positive
+        for i in range(1, len(codes1) + 1):
+            row[0] = i * gap_penalty
+            self._next_row(prev, row, profile[codes1[i - 1]], ramp)
+            j = int(np.argmax(row))
+            if row[j] > alignment_score:  # first cell in row-major order like the full matrix
+                alignment_score, end1, end2 = row[j], i, j
+            prev, row = row, prev
+        return alignment_score, end1, end2
+
+    def _seed_diagonal(self, seq1: str, seq2: str):
+        """
+        Finds the offset of the overlap of two sequences from their shared seed k-mers.
+        Args:
+            seq1: (str) sequence 1
+            seq2: (str) sequence 2
+
+        Returns:
+            (int) diagonal j - i voted by most shared seeds, None if no seed is shared
+
+        """
+        k = self.seed
+        first = {}  # first position of every seed in seq2
+        for j in range(len(seq2) - k + 1):
+            first.setdefault(seq2[j: j + k], j)
+        votes = Counter()
+        for i in range(len(seq1) - k + 1):
+            j = first.get(seq1[i: i + k])
+            if j is not None:
+                votes[j - i] += 1
+        if not votes:
+            return None
+        return votes.most_common(1)[0][0]
+
+    def _band_diagonal(self, seq1: str, seq2: str):
+        """ Returns the centre diagonal of the band to fill, None to fill the full matrix. """
+        if self.band is None or 2 * self.band + 1 >= len(seq2):
+            return None
+        return self._seed_diagonal(seq1, seq2)
+
+    def _fill_band(self, seq1: str, seq2: str, diagonal: int) -> _Band:
+        """
+        Fills the scoring matrix of the local alignment only within a band around a diagonal.
+        Rows are filled with vector operations like the numpy kernel, in O(n*w) time and memory.
+        Args:
+            seq1: (str) sequence 1
+            seq2: (str) sequence 2
+            diagonal: (int) offset j - i of the centre of the band
+
+        Returns:
+            (_Band) band of the (n+1)x(m+1) scoring matrix
+
+        """
+        codes1 = self.encode(seq1)
+        codes2 = self.encode(seq2)
+        n = len(codes1)
+        m = len(codes2)
+        width = 2 * self.band + 1
+        starts = np.arange(n + 1) + diagonal - self.band  # column of the first band cell of every row
+        ramp = np.arange(width) * gap_penalty
 
-        alignment_score = np.amax(mat)
+        # INITIALIZE BAND, the extra last column stays 0 for cells above the band
+        scores = np.zeros((n + 1, width + 1), dtype=int)
+        columns = starts[0] + np.arange(width)
+        inside = (columns >= 0) & (columns <= m)
+        scores[0, :width][inside] = columns[inside] * gap_penalty
+
+        # FILL BAND
+        profile = self.substitution_array[:, codes2]
+        for i in range(1, n + 1):
+            start = starts[i]
+            lo, hi = max(0, 1 - start), min(width, m + 1 - start)  # band cells of columns 1 to m
+            if 0 <= -start < width:  # first column with gap penalties
+                scores[i, -start] = i * gap_penalty
+            if lo >= hi:
+                continue
+            prev = scores[i - 1]
+            # cell k of a row is diagonal to cell k and below cell k + 1 of the previous row
+            row = prev[lo: hi] + profile[codes1[i - 1], start + lo - 1: start + hi - 1]
+            np.maximum(row, prev[lo + 1: hi + 1] + gap_penalty, out=row)
+            np.maximum(row, 0, out=row)
+            np.maximum.accumulate(row - ramp[lo: hi], out=row)
+            scores[i, lo: hi] = row + ramp[lo: hi]
+        return _Band(scores, starts, width, m)
+
+    def pairwise_alignment(self, seq1: str, seq2: str, print_output: bool = False) -> tuple:
+        """
+        Performs pairwise sequence alignment using local alignment method.
+        Smith-Waterman algorithm is used with some modifications to align identical sequence ends.
+        The scoring matrix is filled by the kernel chosen on construction ('numpy' or 'loop').
+        With a band width only a band around the overlap offset found from shared seed k-mers is filled,
+        the full matrix is filled if the sequences share no seed.
+        Args:
+            seq1: (str) sequence 1
+            seq2: (str) sequence 2
+            print_output: (bool) option to print formatted output. Default False
+
+        Returns:
+            tuple(int, float, str)
+            alignment_score: (int) highest score of alignmnet
+            seq_identity: (float) percentage of identical matches
+            aligned_seq1: (str) matched fragment on sequence
+
+        """
+        seq1 = seq1.upper()
+        seq2 = seq2.upper()
+
+        diagonal = self._band_diagonal(seq1, seq2)
+        if diagonal is not None:
+            mat = self._fill_band(seq1, seq2, diagonal)
+            alignment_score, (i, j) = mat.best_cell()
+        else:
+            if self.kernel == 'numpy':
+                mat = self._fill_matrix_numpy(seq1, seq2)
+            else:
+                mat = self._fill_matrix_loop(seq1, seq2)
+            alignment_score = np.amax(mat)
+            max_index = np.where(mat == alignment_score)
+            i, j = max_index[0][0], max_index[1][0]  # starting from max value
 
         # TRACEBACK ALIGNMENT
         alseq1 = ''
         alseq2 = ''  # storing the gaps in alignment
 
-        max_index = np.where(mat == alignment_score)
-        i, j = max_index[0][0], max_index[1][0]  # starting from max value
         while mat[i, j] != 0:
             key = ''.join(sorted((seq1[i - 1], seq2[j - 1])))
             diag_score = mat[i - 1, j - 1] + self.scoring_matrix[key]
@@ -170,22 +841,81 @@ class MSA:
 
         return alignment_score, seq_identity, aligned_seq1
 
-    def perform_msa(self, sequences: list) -> dict:
+    def _msa_options(self) -> dict:
+        """ Returns the constructor options needed to rebuild this aligner in a process pool worker. """
+        return {'kernel': self.kernel, 'band': self.band, 'seed': self.seed}
+
+    def _executor(self, sequences, jobs: int) -> ProcessPoolExecutor:
+        """
+        Starts a process pool whose workers receive the sequences once on start-up.
+        Args:
+            sequences: (list|dict) sequences indexed by the ids used in aligned pairs
+            jobs: (int) number of worker processes
+
+        Returns:
+            (ProcessPoolExecutor) process pool
+
+        """
+        return ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                   initargs=(sequences, self._msa_options()))
+
+    @staticmethod
+    def _map_chunks(executor: ProcessPoolExecutor, func, items: list, jobs: int, chunk_size: int = None) -> list:
+        """
+        Splits items in chunks, maps them on a process pool and returns the results in order of items.
+        Args:
+            executor: (ProcessPoolExecutor) process pool
+            func: (callable) function mapping a chunk of items to a list of results
+            items: (list) items to process
+            jobs: (int) number of worker processes
+            chunk_size: (int) number of items per task. Default spreads items over 4 tasks per worker
+
+        Returns:
+            (list) results of all items
+
+        """
+        if chunk_size is None:
+            chunk_size = max(1, math.ceil(len(items) / (jobs * 4)))
+        chunks = [items[i: i + chunk_size] for i in range(0, len(items), chunk_size)]
+        results = []
+        for chunk_results in executor.map(func, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def perform_msa(self, sequences: list, jobs: int = 1, chunk_size: int = None, score_only: bool = False) -> dict:
         """
         Performs multiple sequence alignment of given sequences using pairwise local alignment method.
+        With more than one job the pairs are aligned in chunks on a process pool.
         Args:
             sequences: (list) list of sequences
+            jobs: (int) number of worker processes. Default 1 aligns in this process
+            chunk_size: (int) number of pairs per task on the process pool
+            score_only: (bool) option to skip the traceback and keep two rows of the scoring matrix. Default False
 
         Returns:
-            pairwise_scores: (dict) scores (values) of all possible pairs of sequences (keys)
+            pairwise_scores: (dict) scores (values) of all possible pairs of sequences (keys),
+                (identity, score, alignment) or (score, end1, end2) of score_alignment with score_only
 
         """
-        all_pairs = [(i, j) for i, j in combinations(sequences, 2)]
-        pairwise_scores = {}
+        if not jobs >= 1:
+            raise AssertionError('Number of jobs should be greater than or equal to 1')
+        all_pairs = [(i, j) for i, j in combinations(range(len(sequences)), 2)]
+
         # perform pairwise alignment of all sequences
-        for seq1, seq2 in all_pairs:
-            score, seq_id, alignment = self.pairwise_alignment(seq1=seq1, seq2=seq2)
-            pairwise_scores[(seq1, seq2)] = (seq_id, score, alignment)
+        if jobs > 1:
+            with self._executor(sequences, jobs) as executor:
+                alignments = self._map_chunks(executor, partial(_align_chunk, score_only=score_only),
+                                              all_pairs, jobs, chunk_size)
+        else:
+            align = self.score_alignment if score_only else self.pairwise_alignment
+            alignments = [align(seq1=sequences[i], seq2=sequences[j]) for i, j in all_pairs]
+
+        if score_only:
+            return {(sequences[i], sequences[j]): scores for (i, j), scores in zip(all_pairs, alignments)}
+
+        pairwise_scores = {}
+        for (i, j), (score, seq_id, alignment) in zip(all_pairs, alignments):
+            pairwise_scores[(sequences[i], sequences[j])] = (seq_id, score, alignment)
 
         return pairwise_scores
 
@@ -193,16 +923,48 @@ class MSA:
 class Assembly(FastaTools, MSA):
     """ Performs reconstruction of nucleotide sequence from kmers/ short reads. """
 
-    def __init__(self, sequences: str, output_path: str = None):
+    def __init__(self, sequences, output_path: str = None, overlap: str = 'alignment', min_overlap: int = 3,
+                 engine: str = 'greedy', k: int = None, jobs: int = 1, chunk_size: int = None, packed: bool = False,
+                 band: int = None, score_only: bool = False):
         FastaTools.__init__(self)
-        MSA.__init__(self)
-        self._check_input_path(sequences)
-        self.seqs = self._read_seq_file(sequences)
-
+        MSA.__init__(self, band=band)
+        self.score_only = score_only
+        if not jobs >= 1:
+            raise AssertionError('Number of jobs should be greater than or equal to 1')
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        if engine not in ['greedy', 'dbg']:
+            raise ValueError(f'Engine "{engine}" is not supported (supported engines: greedy, dbg)')
+        self.engine = engine
+        self.k = k
+        if overlap not in ['alignment', 'exact']:
+            raise ValueError(f'Overlap mode "{overlap}" is not supported (supported modes: alignment, exact)')
+        if not min_overlap >= 1:
+            raise AssertionError('Minimum overlap should be greater than or equal to 1')
+        self.overlap = overlap
+        self.min_overlap = min_overlap
         if output_path is not None:
             self._check_path(output_path)
 
-        self.assembled_sequence = self.de_novo_assembly(sequences=self.seqs, output_path=output_path)
+        if isinstance(sequences, PackedReads):
+            self.seqs = sequences
+            reads = self.seqs
+        elif packed:  # reads are held with 2 bits per base
+            self._check_input_path(sequences)
+            self.seqs = self.packed_reads(sequences)
+            reads = self.seqs
+        elif engine == 'dbg':  # reads are streamed from the file, once more to find k if it is not given
+            self._check_input_path(sequences)
+            self.seqs = None
+            if self.k is None:
+                self.k = self._default_k(self.iter_seq_file(sequences))
+            reads = self.iter_seq_file(sequences)
+        else:
+            self._check_input_path(sequences)
+            self.seqs = self._read_seq_file(sequences)
+            reads = self.seqs
+
+        self.assembled_sequence = self.de_novo_assembly(sequences=reads, output_path=output_path)
 
     @staticmethod
     def _check_input_path(path: str) -> None:
@@ -212,10 +974,10 @@ class Assembly(FastaTools, MSA):
             path: path: (str) path to input file
 
         Raises:
-            ValueError if output file format not in ['txt', 'fasta', 'fastq']
+            ValueError if output file format not in ['txt', 'fasta', 'fastq'], optionally gz or bz2 compressed
 
         """
-        file_format = path.split('.')[-1]
+        file_format = FastaTools.file_format(path)
         if file_format not in ['txt', 'fasta', 'fastq']:
             raise ValueError(f'Format "{file_format}" is not supported for input (supported formats: txt, fasta, fastq)')
 
@@ -244,14 +1006,7 @@ class Assembly(FastaTools, MSA):
             (list) list of sequences
 
         """
-        file_format = file_path.split('.')[-1]
-        if file_format == 'txt':
-            with open(file_path, 'r') as file:
-                return [line.strip().upper() for line in file.readlines()]
-        elif file_format == 'fasta':
-            return self.fasta_list(file_path)
-        elif file_format == 'fastq':
-            return self.fastq_list(file_path)
+        return list(self.iter_seq_file(file_path))
 
     @staticmethod
     def _find_overlapping_ends(seq1: str, seq2: str, aligned_seq: str) -> bool:
@@ -283,7 +1038,7 @@ class Assembly(FastaTools, MSA):
             aligned_seq: (str) fragment of sequence overlapping
 
         Returns:
-            (str) merged sequence
+            (str) merged sequence, the longer sequence if one contains the other
 
         """
         ind1, ind2 = seq1.find(aligned_seq), seq2.find(aligned_seq)
@@ -295,43 +1050,277 @@ class Assembly(FastaTools, MSA):
             return seq1[:ind1]+seq2
         elif ind2 > ind1:
             return seq2[:ind2]+seq1
+        else:  # duplicate sequences or one sequence is the aligned fragment
+            return seq1 if len(seq1) >= len(seq2) else seq2
 
-    def de_novo_assembly(self, sequences: list, output_path: str = None) -> str:
+    @staticmethod
+    def _remove_contained(reads: list, k: int) -> list:
+        """
+        Removes duplicate reads and reads contained in another read.
+        A read is seeded by its first k bases, a read shorter than k by the whole read in an index of the
+        substrings of its length, so there are at most k indices and no read is compared with all others.
+        Args:
+            reads: (list) list of reads
+            k: (int) length of k-mers used to find candidate containing reads
+
+        Returns:
+            (list) reads in input order without duplicates and contained reads
+
+        """
+        unique = list(dict.fromkeys(reads))
+        kmer_indices = {}  # k-mer length to an index from k-mers to ids of reads containing them
+
+        def kmer_index(length: int) -> dict:
+            if length not in kmer_indices:
+                index = kmer_indices[length] = {}
+                for idx, read in enumerate(unique):
+                    for pos in range(len(read) - length + 1):
+                        ids = index.setdefault(read[pos: pos + length], [])
+                        if not ids or ids[-1] != idx:
+                            ids.append(idx)
+            return kmer_indices[length]
+
+        kept = []
+        for read in unique:
+            length = min(k, len(read))
+            candidates = kmer_index(length).get(read[:length], [])
+            if not any(len(unique[other]) > len(read) and read in unique[other] for other in candidates):
+                kept.append(read)
+        return kept
+
+    @staticmethod
+    def _exact_overlaps(reads: list, k: int, left: list, right: list) -> list:
         """
-        Performs De Novo sequence assembly using Greedy algorithm.
+        Finds the maximal exact suffix-prefix overlaps of reads using an index of read prefixes.
+        Suffixes are looked up by their first k bases and the candidate reads are verified.
+        Args:
+            reads: (list) list of reads, none of them contained in another
+            k: (int) minimum length of an overlap
+            left: (list) indices of reads whose suffixes are searched
+            right: (list) indices of reads whose prefixes are indexed
+
+        Returns:
+            (list[tuple]) tuples of (overlap length, index of left read, index of right read)
+
+        """
+        prefix_index = {}
+        for idx in right:
+            if len(reads[idx]) >= k:
+                prefix_index.setdefault(reads[idx][:k], []).append(idx)
+
+        overlaps = []
+        for idx in left:
+            read = reads[idx]
+            found = set()
+            # suffixes are visited from the longest, so the first hit of a pair is its maximal overlap
+            for pos in range(1, len(read) - k + 1):
+                for other in prefix_index.get(read[pos: pos + k], []):
+                    if other != idx and other not in found and reads[other].startswith(read[pos:]):
+                        found.add(other)
+                        overlaps.append((len(read) - pos, idx, other))
+        return overlaps
+
+    def _exact_overlap_assembly(self, sequences: list, seed: int = 12) -> str:
+        """
+        Performs greedy assembly by joining reads along their longest exact suffix-prefix overlaps.
+        Overlaps of at least the seed length are linked first. Shorter overlaps are only searched between
+        read ends left open afterwards, which keeps the search near-linear for tiling reads.
+        Assumes error-free reads. If the reads do not form one contig, contigs are concatenated in input order.
         Args:
             sequences: (list) list of kmers/ short reads
-            output_path: (str) path to output file to store assembled sequence
+            seed: (int) length of the prefix seeds used in the first linking round
 
         Returns:
             (str) assembled sequence
 
         """
-        seqs = deepcopy(sequences)
-        # joining sequence ends to return one long continuous sequence (contig)
-        while len(seqs) > 1:
-            # perform msa
-            pairwise_scores = self.perform_msa(sequences=seqs)
-            # sort pairwise alignments based on scores
-            sorted_scores = sorted(pairwise_scores.items(), key=lambda x: x[1], reverse=True)
+        seed = max(seed, self.min_overlap)
+        reads = self._remove_contained([seq.upper() for seq in sequences], seed)
+        successor = [None] * len(reads)  # (index of next read, overlap length)
+        predecessor = [None] * len(reads)
+        chain = list(range(len(reads)))  # union-find forest of reads joined in one chain
 
-            for scores in sorted_scores:
-                seq1, seq2 = scores[0]
-                alignment = scores[1][2]
+        def find(idx):
+            while chain[idx] != idx:
+                chain[idx] = chain[chain[idx]]
+                idx = chain[idx]
+            return idx
 
-                # find overlapping ends
-                if self._find_overlapping_ends(seq1=seq1, seq2=seq2, aligned_seq=alignment):
-                    merged_seq = self._merge_overlapping_ends(seq1=seq1, seq2=seq2, aligned_seq=alignment)
-                    seqs.remove(seq1)
-                    seqs.remove(seq2)
-                    seqs.append(merged_seq)
+        for k in sorted({seed, self.min_overlap}, reverse=True):
+            left = [idx for idx in range(len(reads)) if successor[idx] is None]
+            right = [idx for idx in range(len(reads)) if predecessor[idx] is None]
+            overlaps = self._exact_overlaps(reads, k, left=left, right=right)
+            overlaps.sort(key=lambda x: (-x[0], x[1], x[2]))  # longest overlaps first
+
+            for length, first, second in overlaps:
+                if successor[first] is None and predecessor[second] is None and find(first) != find(second):
+                    successor[first] = (second, length)
+                    predecessor[second] = first
+                    chain[find(second)] = find(first)
+
+        contigs = []
+        for idx in range(len(reads)):
+            if predecessor[idx] is None:  # first read of a chain
+                parts = [reads[idx]]
+                while successor[idx] is not None:
+                    idx, length = successor[idx]
+                    parts.append(reads[idx][length:])
+                contigs.append(''.join(parts))
+        return ''.join(contigs)
+
+    def _heap_key(self, result: tuple) -> _Reversed:
+        """ Returns the heap key of an alignment, the raw score in score-only mode else (seq_id, score, alignment). """
+        if self.score_only:
+            return _Reversed(result[0])
+        score, seq_id, alignment = result
+        return _Reversed((seq_id, score, alignment))
+
+    def _score_pairs(self, contigs: ContigStore, pairs: list, executor: ProcessPoolExecutor = None) -> list:
+        """
+        Aligns pairs of contigs and returns heap entries ordered like the sorted scores of perform_msa.
+        Args:
+            contigs: (ContigStore) contigs of the assembly
+            pairs: (list[tuple]) pairs of contig ids, first contig inserted before the second
+            executor: (ProcessPoolExecutor) process pool started with the contigs, None aligns in this process
+
+        Returns:
+            (list[tuple]) heap entries of (reversed key, rank 1, rank 2, contig id 1, contig id 2)
+
+        """
+        if executor is not None:
+            alignments = self._map_chunks(executor, partial(_align_chunk, score_only=self.score_only), pairs,
+                                          self.jobs, self.chunk_size)
+        else:
+            align = self.score_alignment if self.score_only else self.pairwise_alignment
+            alignments = [align(seq1=contigs[id1], seq2=contigs[id2]) for id1, id2 in pairs]
+        ranks = contigs.ranks
+        return [(self._heap_key(result), int(ranks[id1]), int(ranks[id2]), id1, id2)
+                for (id1, id2), result in zip(pairs, alignments)]
+
+    def _score_contig(self, contigs: ContigStore, contig_id: int, executor: ProcessPoolExecutor = None) -> list:
+        """
+        Aligns all other contigs against the latest contig and returns the heap entries.
+        Args:
+            contigs: (ContigStore) contigs of the assembly
+            contig_id: (int) id of the contig inserted last
+            executor: (ProcessPoolExecutor) process pool, None aligns in this process
+
+        Returns:
+            (list[tuple]) heap entries of (reversed key, rank, new rank, contig id, new contig id)
+
+        """
+        others = [other for other in contigs.ids() if other != contig_id]
+        if executor is not None:  # the new contig is shipped once per chunk, unlike the initial contigs
+            align = partial(_align_against, contigs[contig_id], score_only=self.score_only)
+            alignments = self._map_chunks(executor, align, [contigs[other] for other in others],
+                                          self.jobs, self.chunk_size)
+        else:
+            align = self.score_alignment if self.score_only else self.pairwise_alignment
+            alignments = [align(seq1=contigs[other], seq2=contigs[contig_id]) for other in others]
+        ranks = contigs.ranks
+        rank = int(ranks[contig_id])
+        return [(self._heap_key(result), int(ranks[other]), rank, other, contig_id)
+                for other, result in zip(others, alignments)]
+
+    def _alignment_assembly(self, sequences: list) -> str:
+        """
+        Performs greedy assembly by joining the best scoring pair of local alignments with overlapping ends.
+        Contigs are kept in a ContigStore and pairwise scores in a heap keyed by contig ids. After a merge only the
+        new contig is aligned against the remaining contigs, entries of merged contigs are dropped when they reach
+        the top of the heap. With more than one job the alignments run on a process pool kept for the whole assembly.
+        In score-only mode pairs are ranked by their alignment score and only the popped pair is traced back.
+        Args:
+            sequences: (list) list of kmers/ short reads
+
+        Returns:
+            (str) assembled sequence
+
+        """
+        contigs = ContigStore(sequences)
+        executor = self._executor(list(sequences), self.jobs) if self.jobs > 1 else None
+        try:
+            heap = self._score_pairs(contigs, list(combinations(range(len(sequences)), 2)), executor)
+            heapq.heapify(heap)
+
+            # joining sequence ends to return one long continuous sequence (contig)
+            while len(contigs) > 1 and heap:
+                scores, rank1, rank2, id1, id2 = heapq.heappop(heap)
+                if contigs.ranks[id1] != rank1 or contigs.ranks[id2] != rank2:  # outdated entry of a merged contig
+                    continue
+                seq1, seq2 = contigs[id1], contigs[id2]
+                if not self.score_only:
+                    alignment = scores.value[2]
+                elif scores.value > 0:
+                    alignment = self.pairwise_alignment(seq1=seq1, seq2=seq2)[2]
+                else:  # no pair left with a common fragment
                     break
-                else:  # if no overlapping ends, check next highest scoring pairwise alignment
-                    pass
+
+                # find overlapping ends, pairs without overlapping ends never get them as long as both contigs exist
+                if self._find_overlapping_ends(seq1=seq1, seq2=seq2, aligned_seq=alignment):
+                    contigs.remove(id1)
+                    contigs.remove(id2)
+                    merged_id = contigs.add(self._merge_overlapping_ends(seq1=seq1, seq2=seq2, aligned_seq=alignment))
+                    for entry in self._score_contig(contigs, merged_id, executor):
+                        heapq.heappush(heap, entry)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # contigs without any overlapping ends are concatenated in input order
+        return ''.join(contigs[contig_id] for contig_id in contigs.ids())
+
+    @staticmethod
+    def _default_k(sequences) -> int:
+        """ Returns the default k-mer length of the De Bruijn graph, the length of the shortest read but at most 21. """
+        if isinstance(sequences, PackedReads):
+            return min(int(sequences.lengths.min()), 21)
+        return min(min(len(seq) for seq in sequences), 21)
+
+    def _de_bruijn_assembly(self, sequences) -> str:
+        """
+        Performs assembly by finding an Eulerian path in the De Bruijn graph of the reads.
+        The k-mer length defaults to the length of the shortest read, at most 21. Consecutive reads must overlap
+        by at least k-1 bases. If the graph has no single Eulerian path, the contigs are concatenated.
+        Args:
+            sequences: (iterable[str]|PackedReads) kmers/ short reads, may be a generator if k is given
+
+        Returns:
+            (str) assembled sequence
+
+        """
+        k = self.k if self.k is not None else self._default_k(sequences)
+        graph = DeBruijnGraph(k=k)
+        if isinstance(sequences, PackedReads):
+            graph.add_packed(sequences)
+        else:
+            graph.add_reads(sequences)
+        return ''.join(graph.contigs())
+
+    def de_novo_assembly(self, sequences: list, output_path: str = None) -> str:
+        """
+        Performs De Novo sequence assembly using Greedy algorithm or a De Bruijn graph ('dbg' engine).
+        Greedy overlaps are found by local alignment or, in 'exact' overlap mode, by exact suffix-prefix matching.
+        Args:
+            sequences: (list|PackedReads) list of kmers/ short reads
+            output_path: (str) path to output file to store assembled sequence
+
+        Returns:
+            (str) assembled sequence
+
+        """
+        if self.engine != 'dbg' and isinstance(sequences, PackedReads):
+            sequences = list(sequences)  # greedy engines work on decoded reads
+
+        if self.engine == 'dbg':
+            assembled_seq = self._de_bruijn_assembly(sequences)
+        elif self.overlap == 'exact':
+            assembled_seq = self._exact_overlap_assembly(sequences)
+        else:
+            assembled_seq = self._alignment_assembly(sequences)
 
         if output_path is not None:
             self._check_path(output_path)
             with open(output_path, 'w') as file:
-                file.write(f'{seqs[0]}\n')
+                file.write(f'{assembled_seq}\n')
 
-        return seqs[0]
+        return assembled_seq
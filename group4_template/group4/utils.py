@@ -9,8 +9,12 @@ DATA_CACHE = os.path.join(PROJECT_DIR, "data")
 os.makedirs(DATA_CACHE, exist_ok=True)
 
 
-# url endpoint
-URL = "https://blast.ncbi.nlm.nih.gov/Blast.cgi?"
+# url endpoint, may be replaced by a local stand-in server (see group4.local_blast)
+NCBI_URL = "https://blast.ncbi.nlm.nih.gov/Blast.cgi?"
+URL = os.environ.get("GROUP4_BLAST_URL", NCBI_URL)
+
+# reference protein FASTA searched offline instead of the BLAST server, if set
+BLAST_FASTA = os.environ.get("GROUP4_BLAST_FASTA")
 
 # Requests
 PUT_Request = "CMD=put&"
@@ -23,4 +27,5 @@ Database_PDB = "DATABASE=pdb"
 
 # GET Parameters
 RID = "RID ="
+RTOE = "RTOE ="
 GET_query_head = URL + GET_Request + "RID="
\ No newline at end of file
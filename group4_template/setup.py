@@ -16,14 +16,13 @@ test_requirements = ['pytest>=3', ]
 setup(
     author="Group 4",
     author_email='kritiamin6461@qmail.com',
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License',
         'Natural Language :: English',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
@@ -36,6 +35,7 @@ setup(
         ],
     },
     install_requires=requirements,
+    extras_require={'arrow': ['pyarrow']},
     license="MIT license",
     include_package_data=True,
     keywords='group4',
@@ -0,0 +1,16 @@
+""" Fixtures shared by the test modules. """
+
+import pytest
+
+from .constants import hemoglobin, myoglobin, insulin
+
+
+@pytest.fixture
+def reference(tmp_path):
+    """ Writes a small protein FASTA file like a PDB seqres dump. """
+    path = tmp_path / "seqres.fasta"
+    path.write_text(f">4HHB_B mol:protein length:69  HEMOGLOBIN\n{hemoglobin[:35]}\n{hemoglobin[35:]}\n"
+                    f">101M_A mol:protein length:77  MYOGLOBIN\n{myoglobin}\n"
+                    f">4INS_B mol:protein length:30  INSULIN\n{insulin}\n"
+                    f">1HBB_B mol:protein length:40  HEMOGLOBIN FRAGMENT\n{hemoglobin[20:60]}\n")
+    return str(path)
@@ -12,3 +12,7 @@ result2_file = str(TEST_FOLDER.joinpath('result2.csv'))
 result3_file = str(TEST_FOLDER.joinpath('result3.tsv'))
 wrong_path = str(TEST_FOLDER.joinpath('result4.pdf'))
 
+# protein sequences of the reference fixture of tests/conftest.py
+hemoglobin = "VHLTPEEKSAVTALWGKVNVDEVGGEALGRLLVVYPWTQRFFESFGDLSTPDAVMGNPKVKAHGKKVLG"
+myoglobin = "VLSEGEWQLVLHVWAKVEADVAGHGQDILIRLFKSHPETLEKFDRVKHLKTEAEMKASEDLKKHGVTVLTALGAILKK"
+insulin = "FVNQHLCGSHLVEALYLVCGERGFFYTPKT"
@@ -0,0 +1,254 @@
+""" Tests for the concurrent batch mode of Blast module. """
+
+import group4.Blast as Blast
+from group4.Blast import Blast_orfs, BlastClient, _RateLimiter, _fasta_batches, _poll_delays, html_reader, zip_reader
+from group4.Blast import Blast_sequence, html_parser, zip_parser, _fetch_matches
+from group4.blast_cache import BlastCache
+
+import asyncio
+import io
+import json
+import time
+import zipfile
+from types import SimpleNamespace
+from urllib.parse import unquote
+
+orfs = ["MKTAYIAKQR", "MVHLTPEEKS", "MKTAYIAKQR", "MSTNPKPQRK"]
+
+
+class TestBlastClient:
+    """ Test class for BlastClient class in Blast module. """
+
+    def test_session(self):
+        """ Checks if the requests share one session retrying on server errors. """
+        client = BlastClient(retries=5, pool_size=4)
+        adapter = client.session.get_adapter("https://blast.ncbi.nlm.nih.gov/Blast.cgi?")
+        assert adapter.max_retries.total == 5
+        assert 503 in adapter.max_retries.status_forcelist
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.allowed_methods == {"GET"}
+
+    def test_poll_delays(self):
+        """ Checks if the first check is after the estimated time and the delays then back off. """
+        delays = _poll_delays("12", poll_interval=60)
+        assert [next(delays) for _ in range(6)] == [12, 10, 20, 40, 60, 60]
+        delays = _poll_delays(None, poll_interval=60)
+        assert next(delays) == 10
+        assert next(_poll_delays("300", poll_interval=60)) == 60
+
+    def test_wait(self, monkeypatch):
+        """ Checks if a request is polled until it is ready. """
+        statuses = iter(["WAITING", "WAITING", "READY"])
+        slept = []
+        monkeypatch.setattr(BlastClient, "status", lambda self, rid: next(statuses))
+        monkeypatch.setattr(Blast.time, "sleep", slept.append)
+        BlastClient().wait("RID", rtoe="3")
+        assert slept == [3, 10, 20]
+
+    def test_wait_failed(self, monkeypatch):
+        """ Checks if waiting ends when the search failed or the request is unknown. """
+        statuses = iter(["WAITING", "UNKNOWN", "FAILED"])
+        monkeypatch.setattr(BlastClient, "status", lambda self, rid: next(statuses))
+        monkeypatch.setattr(Blast.time, "sleep", lambda delay: None)
+        assert BlastClient().wait("RID") == "UNKNOWN"
+        assert BlastClient().wait("RID") == "FAILED"
+
+
+class TestBlastBatch:
+    """ Test class for the concurrent mode of Blast_orfs. """
+
+    def test_rate_limiter(self):
+        """ Checks if calls of concurrent coroutines are spaced by the interval. """
+        limiter = _RateLimiter(0.05)
+        calls = []
+
+        async def call():
+            await limiter.wait()
+            calls.append(time.perf_counter())
+
+        async def run():
+            await asyncio.gather(*(call() for _ in range(3)))
+
+        asyncio.run(run())
+        assert all(b - a >= 0.045 for a, b in zip(calls, calls[1:]))
+
+    def test_concurrent(self, monkeypatch):
+        """ Checks if all ORFs are submitted once and polled on one schedule. """
+        submitted, polled = [], []
+        rids = {}
+
+        def query_Blast(seq, *args):
+            rids[seq] = f"RID{len(rids)}"
+            submitted.append(seq)
+            return SimpleNamespace(text=f"    RID = {rids[seq]}\n    RTOE = 0")
+
+        def check_request_status(rid):
+            polled.append(rid)
+            if rid == "RID2":
+                return "FAILED"
+            return "READY" if polled.count(rid) > 1 else "WAITING"
+
+        monkeypatch.setattr(Blast, "query_Blast", query_Blast)
+        monkeypatch.setattr(Blast, "check_request_status", check_request_status)
+        monkeypatch.setattr(Blast, "_fetch_matches", lambda rid, *args: [rid + "_A"])
+
+        reports = []
+        results = Blast_orfs(orfs, cache=False, concurrent=True, submit_interval=0.01, poll_interval=0.05,
+                             progress=lambda done, total: reports.append((done, total)))
+        assert reports == [(1, 3), (2, 3), (3, 3)]  # the failed search ends first
+        assert sorted(submitted) == sorted(set(orfs))
+        assert list(results) == ["MKTAYIAKQR", "MVHLTPEEKS", "MSTNPKPQRK"]
+        assert results["MKTAYIAKQR"] == ["RID0_A"]
+        assert results["MSTNPKPQRK"] is None
+        assert polled.count("RID0") == 2
+
+    def test_failed_not_cached(self, monkeypatch, tmp_path):
+        """ Checks if a failed search is not cached as a search without hits. """
+        statuses = iter(["FAILED", "READY"])
+        monkeypatch.setattr(Blast, "query_Blast", lambda seq, *args: SimpleNamespace(text="    RID = RID0"))
+        monkeypatch.setattr(Blast, "check_request_status", lambda rid: next(statuses))
+        monkeypatch.setattr(Blast, "_fetch_matches", lambda rid, *args: ["4HHB_A"])
+        cache = BlastCache(str(tmp_path / "cache.sqlite"))
+
+        kwargs = dict(cache=cache, concurrent=True, submit_interval=0, poll_interval=0.01)
+        assert Blast_orfs(orfs[:1], **kwargs) == {"MKTAYIAKQR": None}
+        assert len(cache) == 0
+        assert Blast_orfs(orfs[:1], **kwargs) == {"MKTAYIAKQR": ["4HHB_A"]}
+        assert len(cache) == 1
+
+    def test_concurrent_errors(self, monkeypatch, tmp_path):
+        """ Checks if searches which can not be submitted or fetched fail alone and the others are cached. """
+        def query_Blast(seq, *args, **kwargs):
+            if seq == "MKTAYIAKQR":
+                return SimpleNamespace(text="<html>Error</html>")  # no RID
+            return SimpleNamespace(text=f"    RID = RID_{seq}")
+
+        def get_results(rid, response_format):
+            if rid == "RID_MVHLTPEEKS":
+                return None  # bad status code after the retries
+            return SimpleNamespace(text='<b>Query=</b> \n<tr id="dtr_4HHB_A" ind="0">\n')
+
+        monkeypatch.setattr(Blast, "query_Blast", query_Blast)
+        monkeypatch.setattr(Blast, "check_request_status", lambda rid: "READY")
+        monkeypatch.setattr(Blast, "get_results", get_results)
+        cache = BlastCache(str(tmp_path / "cache.sqlite"))
+
+        results = Blast_orfs(orfs, cache=cache, keep_files=False, concurrent=True, submit_interval=0,
+                             poll_interval=0.01)
+        assert results == {"MKTAYIAKQR": None, "MVHLTPEEKS": None, "MSTNPKPQRK": ["4HHB_A"]}
+        assert len(cache) == 1
+        assert Blast_sequence("MKTAYIAKQR", cache=cache, keep_files=False) is None
+        monkeypatch.setattr(Blast, "_client", BlastClient())
+        monkeypatch.setattr(Blast.BlastClient, "status", lambda self, rid: "READY")
+        monkeypatch.setattr(Blast.time, "sleep", lambda delay: None)
+        assert Blast_sequence("MVHLTPEEKS", cache=cache, keep_files=False) is None
+        assert len(cache) == 1
+
+    def test_sequential_interval(self, monkeypatch):
+        """ Checks if sequential submissions are spaced without waiting after the last one. """
+        slept = []
+        monkeypatch.setattr(Blast, "Blast_sequence", lambda orf, **kwargs: [])
+        monkeypatch.setattr(Blast.time, "sleep", slept.append)
+        Blast_orfs(orfs, cache=False, submit_interval=10)
+        assert slept == [10, 10]
+
+    def test_batches(self):
+        """ Checks if batches are bounded by the number of sequences and residues. """
+        assert _fasta_batches(orfs, max_queries=3) == [[0, 1, 2], [3]]
+        assert _fasta_batches(orfs, max_letters=25) == [[0, 1], [2, 3]]
+        assert _fasta_batches(["M" * 30, "M"], max_letters=25) == [[0], [1]]
+
+    def test_demultiplex(self, tmp_path):
+        """ Checks if the html and json results of a multi-FASTA query are split per query. """
+        html = tmp_path / "batch.html"
+        html.write_text("<b>Query=</b> query0\n"
+                        '<tr id="dtr_1ABC_A" ind="0">\n'
+                        '<tr id="dtr_2XYZ_B" ind="1">\n'
+                        "<b>Query=</b> query2\n"
+                        "<b>Query=</b> query3\n"
+                        '<tr id="dtr_4HHB_A" ind="0">\n')
+        expected = {"query0": ["1ABC_A", "2XYZ_B"], "query2": [], "query3": ["4HHB_A"]}
+        assert html_reader(str(html), per_query=True) == expected
+        assert html_reader(str(html)) == ["1ABC_A", "2XYZ_B", "4HHB_A"]
+
+        archive = tmp_path / "batch.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("RID.json", "{}")
+            for n, (title, ids) in enumerate(expected.items()):
+                search = {"query_title": title, "hits": [{"description": [{"id": i}]} for i in ids]}
+                report = {"BlastOutput2": {"report": {"results": {"search": search}}}}
+                zf.writestr(f"RID_{n + 1}.json", json.dumps(report))
+        assert zip_reader(str(archive), per_query=True) == expected
+
+    def test_batched(self, monkeypatch):
+        """ Checks if batches are submitted as one request each and the hits are mapped back to the ORFs. """
+        submitted = []
+
+        def query_Blast(seq, *args):
+            submitted.append(unquote(seq))
+            return SimpleNamespace(text=f"    RID = RID{len(submitted)}")
+
+        def fetch(rid, filename, file_type, keep_files, per_query=False):
+            titles = [line[1:] for line in submitted[int(rid[3:]) - 1].splitlines() if line.startswith(">")]
+            return {title: [title + "_A"] for title in titles if title != "query1"}
+
+        monkeypatch.setattr(Blast, "query_Blast", query_Blast)
+        monkeypatch.setattr(Blast, "check_request_status", lambda rid: "READY")
+        monkeypatch.setattr(Blast.BlastClient, "status", lambda self, rid: "READY")
+        monkeypatch.setattr(Blast, "_fetch_matches", fetch)
+
+        reports = []
+        results = Blast_orfs(orfs, cache=False, batched=True, max_queries=2, submit_interval=0, poll_interval=0,
+                             progress=lambda done, total: reports.append((done, total)))
+        assert reports == [(2, 3), (3, 3)]
+        assert submitted == [">query0\nMKTAYIAKQR\n>query1\nMVHLTPEEKS", ">query2\nMSTNPKPQRK"]
+        assert results == {"MKTAYIAKQR": ["query0_A"], "MVHLTPEEKS": None, "MSTNPKPQRK": ["query2_A"]}
+
+        submitted.clear()
+        monkeypatch.setattr(Blast, "check_request_status", lambda rid: "FAILED" if rid == "RID2" else "READY")
+        results = Blast_orfs(orfs, cache=False, batched=True, concurrent=True, max_queries=2, submit_interval=0,
+                             poll_interval=0.01)
+        assert len(submitted) == 2
+        assert results == {"MKTAYIAKQR": ["query0_A"], "MVHLTPEEKS": None, "MSTNPKPQRK": None}
+
+
+class TestBlastParsers:
+    """ Test class for the in-memory parsers of Blast module. """
+
+    @staticmethod
+    def zip_result(n_hits: int) -> bytes:
+        """ Builds a zipped JSON2 result with n_hits hits. """
+        search = {"query_id": "Query_1", "query_title": "query0", "query_len": 10,
+                  "hits": [{"num": i, "description": [{"id": f"{i}ABC_A", "title": "[x] \\ {y}"}]}
+                           for i in range(n_hits)],
+                  "stat": {}}
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            zf.writestr("RID.json", "{}")
+            zf.writestr("RID_1.json", json.dumps({"BlastOutput2": {"report": {"results": {"search": search}}}},
+                                                 indent=2))
+        return buffer.getvalue()
+
+    def test_zip_parser(self, monkeypatch):
+        """ Checks if hits streamed across chunk boundaries are all extracted. """
+        monkeypatch.setattr(Blast, "STREAM_CHUNK", 7)
+        content = self.zip_result(50)
+        assert zip_parser(content) == [f"{i}ABC_A" for i in range(50)]
+        assert zip_parser(content, per_query=True) == {"query0": [f"{i}ABC_A" for i in range(50)]}
+        assert zip_parser(self.zip_result(0)) == []
+
+    def test_html_parser(self):
+        """ Checks if html results are parsed from text and bytes. """
+        html = '<b>Query=</b> query0\n<tr id="dtr_1ABC_A" ind="0">\n'
+        assert html_parser(html) == ["1ABC_A"]
+        assert html_parser(html.encode(), per_query=True) == {"query0": ["1ABC_A"]}
+
+    def test_fetch_matches(self, monkeypatch, tmp_path):
+        """ Checks if results are only written to a file when they are kept. """
+        content = self.zip_result(2)
+        monkeypatch.setattr(Blast, "get_results", lambda rid, response_format: SimpleNamespace(content=content))
+        monkeypatch.setattr(Blast, "DATA_CACHE", str(tmp_path))
+        assert _fetch_matches("RID", "result", "json", keep_files=False) == ["0ABC_A", "1ABC_A"]
+        assert not list(tmp_path.iterdir())
+        assert _fetch_matches("RID", "result", "json", keep_files=True) == ["0ABC_A", "1ABC_A"]
+        assert zip_reader(str(tmp_path / "result.zip")) == ["0ABC_A", "1ABC_A"]
@@ -0,0 +1,50 @@
+""" Tests for blast_cache module. """
+
+import time
+import pytest
+
+from group4.blast_cache import BlastCache
+from group4.Blast import Blast_orfs, Blast_sequence
+from group4.utils import Program, Database_PDB
+
+toy_orf = "VHLTPEEKSAVTALWGKVNVDEVGGEALGRLLVVYPWTQRFFESFGDLSTPDAVMGNPKVKAHGKKVLG"
+
+
+class TestBlastCache:
+    """ Test class for BlastCache class in blast cache module. """
+
+    def test_key(self):
+        """ Checks if keys depend on the sequence and the search parameters only. """
+        key = BlastCache.key(toy_orf, Program, Database_PDB)
+        assert key == BlastCache.key(toy_orf.lower(), Program, Database_PDB)
+        assert key != BlastCache.key(toy_orf, Program, "DATABASE=refseq")
+        assert key != BlastCache.key(toy_orf, Program, Database_PDB, filters="&THRESHOLD=13")
+        assert key != BlastCache.key(toy_orf[1:], Program, Database_PDB)
+
+    def test_eviction(self, tmp_path):
+        """ Checks if expired and least recently used entries are evicted. """
+        cache = BlastCache(path=str(tmp_path / "cache.sqlite"), max_entries=2)
+        cache.put("a", ["1ABC_A"])
+        cache.put("b", [])
+        assert cache.get("a") == ["1ABC_A"]  # 'a' is now used more recently than 'b'
+        assert cache.get("b") == []
+        time.sleep(0.01)
+        cache.get("a")
+        cache.put("c", ["2XYZ_B"])
+        assert len(cache) == 2
+        assert cache.get("b") is None
+
+        expiring = BlastCache(path=str(tmp_path / "cache.sqlite"), ttl=0.05)
+        time.sleep(0.1)
+        assert expiring.get("a") is None
+
+        with pytest.raises(AssertionError, match=r".* should be greater .*"):
+            BlastCache(path=str(tmp_path / "cache.sqlite"), max_entries=0)
+
+    def test_cached_blast(self, tmp_path):
+        """ Checks if cached ORFs are not submitted to the server. """
+        cache = BlastCache(path=str(tmp_path / "cache.sqlite"))
+        cache.put(BlastCache.key(toy_orf, Program, Database_PDB), ["4HHB_A"])
+
+        assert Blast_sequence(toy_orf, cache=cache) == ["4HHB_A"]
+        assert Blast_orfs([toy_orf, toy_orf], cache=cache) == {toy_orf: ["4HHB_A"]}
@@ -41,10 +41,85 @@ class TestTranscribe:
         with pytest.raises(ValueError, match=r".* not supported .*"):
             Transcribe(dna=wrong_path)
 
+    def test_gene_finder(self):
+        """ Checks if the vectorized ORF engine finds the same positions as the codon by codon scan. """
+        mrna = 'GAUGAAAUGCCCUAAAUGGGAUGAUAGCCAUGUUUNAUGCCCUGA'
+        positions = Transcribe.gene_finder(mrna)
+        assert positions == {(6, 15), (15, 24), (36, 45)}
+        assert list(positions) == list(Transcribe.gene_finder(mrna, vectorized=False))
+        assert Transcribe.gene_finder('AUGAUGCAUUAG') == {(0, 12)}  # longest sequence from one stop codon
+        assert Transcribe.gene_finder('AU') == set()
+
+        obj = Transcribe(dna_seq, reverse=True, threshold=3, vectorized=False)
+        assert obj.genes == Transcribe(dna_seq, reverse=True, threshold=3).genes
+
+    def test_lean_genes(self):
+        """ Checks if genes spliced lazily from the dna bytes match the genes of the mRNA strands. """
+        obj = Transcribe(dna_seq, reverse=True, threshold=3)
+        lean = Transcribe(dna_seq, reverse=True, threshold=3, lean=True)
+
+        assert lean.genes['reverse'][(89, 107)] == 'AUGCUUUGGUUUCUAUGA'
+        assert 'f_mrna' not in vars(lean) and 'r_mrna' not in vars(lean)  # no mRNA copies were made
+        assert dict(lean.genes['forward']) == obj.genes['forward']
+        assert dict(lean.genes['reverse']) == obj.genes['reverse']
+        assert lean.genes_data.equals(obj.genes_data)
+        assert lean.spans[-1] == ('reverse', 89, 107)
+
+        with pytest.raises(KeyError):
+            lean.genes['forward'][(0, 3)]
+
+    def test_lazy_stages(self):
+        """ Checks if only the stages that are used are computed. """
+        obj = Transcribe(dna_seq, reverse=False, threshold=3)
+        assert 'genes' not in vars(obj)
+
+        assert len(obj.genes['forward']) == 2
+        assert 'r_mrna' not in vars(obj) and 'genes_data' not in vars(obj)  # reverse strand is never read
+        assert obj.r_mrna == Transcribe.transcribe(Transcribe.complementary_dna(obj.dna))
+
+    def test_parallel_frames(self):
+        """ Checks if scanning chunks of the six frames on a process pool finds the same genes. """
+        obj = Transcribe(dna_seq, reverse=True, threshold=3)
+        for chunk_size in [None, 10]:  # ORFs crossing chunk borders are paired over the whole strand
+            parallel = Transcribe(dna_seq, reverse=True, threshold=3, jobs=2, chunk_size=chunk_size)
+            assert list(parallel.genes['forward'].items()) == list(obj.genes['forward'].items())
+            assert list(parallel.genes['reverse'].items()) == list(obj.genes['reverse'].items())
+
+        with pytest.raises(AssertionError, match=r".* should be greater .*"):
+            Transcribe(dna_seq, jobs=0)
+
+    def test_parallel_frames_without_shared_memory(self, monkeypatch):
+        """ Checks if the frames are scanned in parallel without multiprocessing.shared_memory (Python 3.7). """
+        import multiprocessing
+        import sys
+        monkeypatch.delattr(multiprocessing, 'shared_memory', raising=False)
+        monkeypatch.setitem(sys.modules, 'multiprocessing.shared_memory', None)
+        obj = Transcribe(dna_seq, reverse=True, threshold=3)
+        parallel = Transcribe(dna_seq, reverse=True, threshold=3, jobs=2, chunk_size=10)
+        assert list(parallel.genes['forward'].items()) == list(obj.genes['forward'].items())
+        assert list(parallel.genes['reverse'].items()) == list(obj.genes['reverse'].items())
+
     def test_store_genes(self):
         with pytest.raises(ValueError, match=r".* not supported .*"):
             Transcribe(dna_seq).store_genes(path=wrong_path)
 
+    @pytest.mark.parametrize('file_format', ['parquet', 'feather'])
+    def test_columnar_genes(self, tmp_path, file_format):
+        """ Checks if genes stored in columnar files are loaded with integer positions and a categorical strand. """
+        pytest.importorskip('pyarrow')
+        path = str(tmp_path / f'genes.{file_format}')
+        obj = Transcribe(dna_seq, reverse=True, threshold=3, output_path=path)
+        table = Transcribe.load_table(path)
+
+        assert list(table.columns) == ['strand', 'start', 'end', 'mrna']
+        assert str(table['strand'].dtype) == 'category'
+        assert list(zip(table['strand'], table['start'], table['end'])) == obj.spans
+        assert list(table['mrna']) == list(obj.genes_data['mrna'])
+        assert Transcribe.load_table(path, arrow=True).num_rows == len(obj.spans)
+
+        with pytest.raises(ValueError, match=r".* not supported .*"):
+            Transcribe.load_table(result1_file)
+
 
 class TestTranslate:
     """ Test class for Translate class in gene finder module."""
@@ -62,3 +137,26 @@ class TestTranslate:
 
         with pytest.raises(AssertionError, match=r".* should be greater .*"):
             Translate(dna=dna_seq, reverse=True, threshold=-3)
+
+        with pytest.raises(ValueError, match=r".* not supported .*"):
+            obj.store_proteins(path=wrong_path)
+
+        columnar = Translate(dna=dna_seq, reverse=True, threshold=3, columnar=True)
+        assert list(columnar.proteins_table.columns) == ['strand', 'start', 'end', 'amino_acid_sequence']
+        assert str(columnar.proteins_table['strand'].dtype) == 'category'
+        assert list(columnar.proteins_table['start']) == [int(pos.split('-')[0]) for pos in table['position']]
+        assert list(columnar.proteins_table['amino_acid_sequence']) == list(table['amino_acid_sequence'])
+        assert list(columnar.genes_data['mrna']) == list(obj.genes_data['mrna'])
+
+        lazy = Translate(dna=dna_seq, reverse=True, threshold=3)
+        assert lazy.proteins == proteins
+        assert 'genes_data' not in vars(lazy)  # proteins are translated without the dataframe
+        assert lazy.proteins_table.equals(table)
+
+    def test_translate_batch(self):
+        """ Checks if batch translation agrees with translating one sequence at a time. """
+        obj = Translate(dna=dna_seq, reverse=True, threshold=3)
+        mrnas = list(obj.genes_data['mrna']) + ['AUGGCUAUGUAAGGG', '', 'GCUUGAGCU']
+        assert obj.translate_batch(mrnas) == [obj.translate(mrna) for mrna in mrnas]
+        assert obj.translate_batch(['AUGNNNGCUUAA', 'GC']) == ['XA', '']  # unknown codon, incomplete codon
+        assert obj.translate_batch([]) == []
@@ -0,0 +1,78 @@
+""" Tests for jobs module. """
+
+import group4.jobs as jobs
+from group4.jobs import JobQueue
+import os
+import shutil
+import time
+from .constants import *
+
+
+def wait_job(queue: JobQueue, job_id: str, timeout: float = 30) -> dict:
+    """ Waits until a job is done or failed and returns its status. """
+    end = time.time() + timeout
+    while time.time() < end:
+        status = queue.status(job_id)
+        if status['status'] in ['done', 'failed']:
+            return status
+        time.sleep(0.05)
+    raise TimeoutError(job_id)
+
+
+class TestJobQueue:
+    """ Test class for JobQueue class in jobs module. """
+
+    def test_in_process(self, tmp_path, monkeypatch):
+        """ Checks if a job runs the pipeline on a thread and reports its progress and result. """
+        reports = []
+
+        def blast_orfs(orfs, progress=None):
+            for done in range(1, len(set(orfs)) + 1):
+                progress(done, len(set(orfs)))
+                reports.append(done)
+            return {orf: ["4HHB_A"] for orf in orfs}
+
+        monkeypatch.setattr(jobs, "Blast_orfs", blast_orfs)
+        queue = JobQueue(jobs_dir=str(tmp_path), workers=1, processes=False)
+        assert queue.in_process
+        job_id = queue.submit(kmers_seqs)
+        status = wait_job(queue, job_id)
+        queue.shutdown()
+
+        assert status['status'] == 'done'
+        assert status['step'] == status['steps']
+        result = queue.result(job_id)
+        assert len(result['assembled']) > 0
+        assert 'predicted_proteins' in result['table']
+        assert reports == list(range(1, len(reports) + 1))
+
+    def test_failed(self, tmp_path):
+        """ Checks if errors of the pipeline and unknown jobs are reported. """
+        queue = JobQueue(jobs_dir=str(tmp_path), workers=1, processes=False)
+        job_id = queue.submit(str(tmp_path / "missing.txt"))
+        status = wait_job(queue, job_id)
+        queue.shutdown()
+
+        assert status['status'] == 'failed'
+        assert 'FileNotFoundError' in status['error']
+        assert queue.result(job_id) is None
+        assert queue.status('0' * 32) is None
+        assert queue.status('../status') is None
+
+    def test_cleanup(self, tmp_path, monkeypatch):
+        """ Checks if moved uploads are kept with their job and expired jobs are removed. """
+        monkeypatch.setattr(jobs, "Blast_orfs", lambda orfs, progress=None: {orf: [] for orf in orfs})
+        upload = tmp_path / "upload.txt"
+        shutil.copy(kmers_seqs, upload)
+        queue = JobQueue(jobs_dir=str(tmp_path / "jobs"), workers=1, processes=False, retention=60)
+        job_id = queue.submit(str(upload), move=True)
+        assert wait_job(queue, job_id)['status'] == 'done'
+        queue.shutdown()
+        assert not upload.exists()
+        assert os.path.exists(os.path.join(queue.job_dir(job_id), "upload.txt"))
+
+        assert queue.cleanup() == []
+        old = time.time() - 120
+        os.utime(os.path.join(queue.job_dir(job_id), "status.json"), (old, old))
+        assert queue.cleanup() == [job_id]
+        assert queue.status(job_id) is None
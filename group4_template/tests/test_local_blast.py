@@ -0,0 +1,91 @@
+""" Tests for local_blast module. """
+
+import group4.Blast as Blast
+from group4.Blast import Blast_orfs, BlastClient
+from group4.local_blast import LocalSearch, LocalBlastServer, LocalBlastService, LocalClient
+
+import threading
+import numpy as np
+import pytest
+
+from .constants import *
+
+
+class TestLocalSearch:
+    """ Test class for LocalSearch class in local_blast module. """
+
+    def test_search(self, reference):
+        """ Checks if the hits are found by decreasing score. """
+        search = LocalSearch(reference)
+        assert search.accessions == ["4HHB_B", "101M_A", "4INS_B", "1HBB_B"]
+        assert search.accession_list(hemoglobin) == ["4HHB_B", "1HBB_B"]
+        # myoglobin is a homolog with single seeds on its diagonals
+        assert LocalSearch(reference, min_seeds=1).accession_list(hemoglobin) == ["4HHB_B", "1HBB_B", "101M_A"]
+        assert search.accession_list(insulin[2:28]) == ["4INS_B"]
+        assert search.accession_list("WWWWWWWWWW") == []
+
+    def test_source(self, reference):
+        """ Checks if searches with other parameters do not share cached results. """
+        search = LocalSearch(reference)
+        assert search.source == LocalSearch(reference).source
+        for kwargs in [dict(k=2), dict(min_seeds=1), dict(max_candidates=5), dict(min_score=10)]:
+            assert LocalSearch(reference, **kwargs).source != search.source
+
+    def test_scores(self, reference):
+        """ Checks if aligning all candidates in one pass gives the score of every single alignment. """
+        search = LocalSearch(reference)
+        ids = np.arange(4)
+        for query in [hemoglobin, myoglobin[10:50], insulin]:
+            scores = search.scores(query, ids)
+            assert list(scores) == [search.scores(query, [i])[0] for i in ids]
+        assert search.scores(insulin, [2])[0] == 168  # sum of the BLOSUM62 diagonal of insulin
+
+        with pytest.raises(AssertionError, match=r".* should be greater .*"):
+            LocalSearch(reference, min_seeds=0)
+
+
+class TestLocalBackends:
+    """ Test class for the local backends of Blast module. """
+
+    def test_local_client(self, reference, monkeypatch):
+        """ Checks if Blast_orfs works unchanged against the in-process backend. """
+        monkeypatch.setattr(Blast, "_client", LocalClient(LocalSearch(reference)))
+        orfs = [hemoglobin, insulin, hemoglobin]
+        expected = {hemoglobin: ["4HHB_B", "1HBB_B"], insulin: ["4INS_B"]}
+        assert Blast_orfs(orfs, cache=False, keep_files=False) == expected
+        assert Blast_orfs(orfs, cache=False, keep_files=False, file_type="json", batched=True) == expected
+
+    def test_server(self, reference, monkeypatch):
+        """ Checks if Blast_orfs works unchanged against the http stand-in server. """
+        server = LocalBlastServer(LocalSearch(reference))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            client = BlastClient(url=server.url)
+            assert client.submit_interval == 0
+            monkeypatch.setattr(Blast, "_client", client)
+            orfs = [myoglobin, insulin]
+            expected = {myoglobin: ["101M_A"], insulin: ["4INS_B"]}
+            assert Blast_orfs(orfs, cache=False, keep_files=False) == expected
+            assert Blast_orfs(orfs, cache=False, keep_files=False, file_type="json", concurrent=True,
+                              poll_interval=0.01) == expected
+            assert Blast_orfs(orfs, cache=False, keep_files=False, batched=True, poll_interval=0.01) == expected
+            assert client.status("MISSING") == "UNKNOWN"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_max_results(self, reference):
+        """ Checks if only the results of the most recently used RIDs are kept. """
+        client = LocalClient(LocalSearch(reference))
+        client.service = LocalBlastService(client.service.search, max_results=2)
+        rids = [client.put(seq).text.split("RID = ")[1].split()[0] for seq in [hemoglobin, insulin]]
+        assert client.status(rids[0]) == "READY"  # now the most recently used
+        client.put(myoglobin)
+        assert len(client.service.results) == 2
+        assert client.status(rids[0]) == "READY"
+        assert client.status(rids[1]) == "UNKNOWN"
+
+        with pytest.raises(AssertionError, match=r".* should be greater .*"):
+            LocalBlastService(client.service.search, max_results=0)
+
@@ -0,0 +1,48 @@
+""" Tests for packed_reads module. """
+
+from group4.packed_reads import PackedReads, encode, decode
+from group4.sequence_assembly import FastaTools
+import numpy as np
+import pytest
+from .constants import *
+
+reads = ['GATTACA', 'ACGT', '', 'TTGCAGGCA', 'C']
+
+
+class TestPackedReads:
+    """ Test class for PackedReads class in packed reads module. """
+
+    def test_round_trip(self):
+        """ Checks if reads are unpacked unchanged, also across chunks. """
+        for chunk_size in [1, 3, 1 << 22]:
+            packed = PackedReads.from_reads(iter(reads), chunk_size=chunk_size)
+            assert len(packed) == len(reads)
+            assert list(packed) == reads
+            assert packed.lengths.tolist() == [len(read) for read in reads]
+        assert packed.data.nbytes == -(-sum(map(len, reads)) // 4)
+
+        assert decode(encode('gattaca')) == 'GATTACA'
+        with pytest.raises(ValueError):
+            encode('GATNACA')
+
+    def test_views(self):
+        """ Checks if slices and reverse complements are viewed correctly. """
+        packed = PackedReads.from_reads(reads)
+        read = packed[3]
+        assert str(read) == 'TTGCAGGCA'
+        assert str(read[2:6]) == 'GCAG'
+        assert str(read.reverse_complement()) == 'TGCCTGCAA'
+        assert str(read.reverse_complement()[1:4]) == 'GCC'
+        assert str(packed[-1]) == 'C'
+        assert list(packed[1:4]) == reads[1:4]
+
+        with pytest.raises(IndexError):
+            packed[len(reads)]
+
+    def test_save_load(self, tmp_path):
+        """ Checks if saved reads are memory-mapped unchanged. """
+        path = str(tmp_path / 'reads')
+        packed = FastaTools.packed_reads(kmers_seqs, path=path)
+        assert isinstance(packed.data, np.memmap)
+        assert list(packed) == list(FastaTools.iter_seq_file(kmers_seqs))
+        assert list(PackedReads.load(path, mmap=False)) == list(packed)
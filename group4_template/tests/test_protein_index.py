@@ -0,0 +1,52 @@
+""" Tests for protein_index module. """
+
+from group4.protein_index import ProteinIndex, encode_protein
+from group4.local_blast import LocalSearch
+
+import numpy as np
+import pytest
+
+from .constants import *
+
+
+class TestProteinIndex:
+    """ Test class for ProteinIndex class in protein_index module. """
+
+    def test_build(self, reference):
+        """ Checks if every k-mer occurrence is posted with its protein and offset. """
+        index = ProteinIndex.build(reference, k=3)
+        assert len(index) == 4
+        assert index.accessions == ["4HHB_B", "101M_A", "4INS_B", "1HBB_B"]
+        assert len(index.postings_protein) == sum(len(seq) - 2 for seq in [hemoglobin, myoglobin, insulin,
+                                                                           hemoglobin[20:60]])
+        codes = encode_protein("GKV")
+        code = (int(codes[0]) * 24 + int(codes[1])) * 24 + int(codes[2])
+        postings = slice(index.kmer_starts[code], index.kmer_starts[code + 1])
+        assert list(zip(index.postings_protein[postings], index.postings_offset[postings])) == [(0, 15)]
+        assert np.array_equal(index.sequence(2), encode_protein(insulin))
+
+        with pytest.raises(AssertionError, match=r".* should be greater .*"):
+            ProteinIndex.build(reference, k=6)
+
+    def test_candidates(self, reference):
+        """ Checks if candidates are ranked by the seeds on their best diagonal. """
+        index = ProteinIndex.build(reference, k=3)
+        ids, seeds = index.candidates(hemoglobin[10:50])
+        assert list(ids) == [0, 3]
+        assert list(seeds) == [38, 28]  # all k-mers of the query, and of the 30 residues shared with the fragment
+        assert index.query(hemoglobin[10:50]) == ["4HHB_B", "1HBB_B"]
+        assert index.query(hemoglobin[10:50], max_candidates=1) == ["4HHB_B"]
+        # shuffled k-mers are shared but not on one diagonal
+        assert index.query(hemoglobin[30:33] + "WWW" + hemoglobin[10:13]) == []
+        assert index.query("WW") == []
+
+    def test_save_load(self, reference, tmp_path):
+        """ Checks if a saved index is memory-mapped and searched like the built one. """
+        index = ProteinIndex.build(reference, k=3)
+        index.save(str(tmp_path / "index"))
+        loaded = ProteinIndex.load(str(tmp_path / "index"))
+        assert isinstance(loaded.postings_protein, np.memmap)
+        assert loaded.source == index.source
+        assert loaded.query(insulin) == index.query(insulin) == ["4INS_B"]
+        search = LocalSearch(str(tmp_path / "index"))
+        assert search.accession_list(hemoglobin) == LocalSearch(reference).accession_list(hemoglobin)
@@ -1,7 +1,10 @@
 """ Tests for sequence_assembly module. """
 
-from group4.sequence_assembly import MSA, Assembly, FastaTools
+from group4.sequence_assembly import MSA, Assembly, FastaTools, DeBruijnGraph, ContigStore
+import numpy as np
 import pytest
+import bz2
+import gzip
 import os
 from .constants import *
 
@@ -30,6 +33,30 @@ class TestFastaTools:
         assert len(fastq) == 4
         assert fastq[2] == check
 
+    def test_compressed_streams(self, tmp_path):
+        """ Checks if compressed files are read lazily and quality lines starting with '@' are skipped. """
+        records = '@read1\nGATTACA\n+\n@@@@@@@\n@read2\nACAGGT\n+read2\nFFFFFF\n'
+        for suffix, module in [('gz', gzip), ('bz2', bz2)]:
+            path = str(tmp_path.joinpath(f'reads.fastq.{suffix}'))
+            with module.open(path, 'wt') as file:
+                file.write(records)
+
+            reads = FastaTools().iter_fastq(path)
+            assert next(reads) == 'GATTACA'
+            assert list(reads) == ['ACAGGT']
+            assert FastaTools.file_format(path) == 'fastq'
+
+        path = str(tmp_path.joinpath('reads.fasta.gz'))
+        with gzip.open(path, 'wt') as file:
+            file.write('>read1\nGATT\nACA\n>read2\nACAGGT\n')
+        assert FastaTools().fasta_list(path) == ['GATTACA', 'ACAGGT']
+
+        path = str(tmp_path.joinpath('broken.fastq'))
+        with open(path, 'w') as file:
+            file.write('@read1\nGATTACA\n')
+        with pytest.raises(ValueError, match=r".* incomplete"):
+            FastaTools().fastq_list(path)
+
 
 class TestMSA:
     """ Test class for MSA class in sequence assembly module. """
@@ -52,6 +79,40 @@ class TestMSA:
         assert identity2 == 100.0
         assert aligned_seq2 == 'AGCGTTTAAAGC'
 
+    def test_alignment_kernels(self):
+        """ Checks if the vectorized kernel gives the same alignment as the cell by cell kernel. """
+        test_seqs = ['CTGGTAGCAGTAGCGTTTAAAGCGC',
+                     'GCAGTAGCGTTTAAAGCGCAATGCA',
+                     'GCGCAATGCANNTAGCAT']
+
+        for seq1, seq2 in combinations(test_seqs, 2):
+            loop = MSA(kernel='loop')
+            vectorized = MSA(kernel='numpy')
+            assert (loop._fill_matrix_loop(seq1, seq2) == vectorized._fill_matrix_numpy(seq1, seq2)).all()
+            assert loop.pairwise_alignment(seq1, seq2) == vectorized.pairwise_alignment(seq1, seq2)
+
+        with pytest.raises(ValueError, match=r".* not supported .*"):
+            MSA(kernel='simd')
+
+    def test_banded_alignment(self):
+        """ Checks if the banded alignment of overlapping reads agrees with the full matrix. """
+        test_seqs = ['CTGGTAGCAGTAGCGTTTAAAGCGC',
+                     'GCAGTAGCGTTTAAAGCGCAATGCA',
+                     'GCAGTAGCGTTAAAGCGCAATGCA',  # deletion in the overlap
+                     'GAAATGCTATTCAATGCATTGATGC']
+        full = MSA()
+        banded = MSA(band=2, seed=6)
+        assert banded._seed_diagonal(test_seqs[0], test_seqs[1]) == -6
+        assert banded._seed_diagonal(test_seqs[0], test_seqs[3]) is None  # no shared seed, full matrix is filled
+
+        for seq1, seq2 in combinations(test_seqs, 2):
+            assert banded.pairwise_alignment(seq1, seq2) == full.pairwise_alignment(seq1, seq2)
+        assert banded.perform_msa(sequences=test_seqs) == full.perform_msa(sequences=test_seqs)
+        assert Assembly(sequences=kmers_seqs, band=4).assembled_sequence == check_seq1
+
+        with pytest.raises(AssertionError):
+            MSA(band=-1)
+
     def test_perform_msa(self):
         """ Tests if multiple sequence alignment functions as expected. """
         test_seqs = ['CTGGTAGCAGTAGCGTTTAAAGCGC',
@@ -65,6 +126,43 @@ class TestMSA:
         assert list(scores.keys()) == pairs
         assert scores[pairs[1]] == (100.0, 3, 'GCA')
 
+        # parallel alignment on a process pool gives the same scores in the same order
+        parallel_scores = MSA().perform_msa(sequences=test_seqs, jobs=2, chunk_size=1)
+        assert list(parallel_scores.items()) == list(scores.items())
+
+    def test_score_alignment(self):
+        """ Checks if the score-only alignment finds the highest scoring cell of the full matrix. """
+        test_seqs = ['CTGGTAGCAGTAGCGTTTAAAGCGC',
+                     'GCAGTAGCGTTTAAAGCGCAATGCA',
+                     'GAAATGCTATTCAATGCATTGATGC']
+        msa = MSA()
+        for seq1, seq2 in combinations(test_seqs, 2):
+            mat = msa._fill_matrix_numpy(seq1, seq2)
+            score, end1, end2 = msa.score_alignment(seq1, seq2)
+            assert score == mat.max()
+            assert (end1, end2) == tuple(np.argwhere(mat == score)[0])
+
+        scores = msa.perform_msa(sequences=test_seqs, score_only=True)
+        assert scores[(test_seqs[0], test_seqs[1])] == (18, 25, 19)  # without the bonus of a match preceding the alignment
+        assert msa.perform_msa(sequences=test_seqs, jobs=2, score_only=True) == scores
+
+        assert Assembly(sequences=kmers_seqs, score_only=True).assembled_sequence == check_seq1
+
+
+class TestContigStore:
+    """ Test class for ContigStore class in sequence assembly module. """
+
+    def test_contig_store(self):
+        """ Checks if contigs keep their ids and removed ids are reused. """
+        store = ContigStore(['AAC', 'ACG', 'CGT'])
+        assert store.remove(1) == 'ACG'
+        assert 1 not in store and len(store) == 2
+
+        new_id = store.add('AACGT')
+        assert new_id == 1
+        assert store.ids() == [0, 2, 1]  # order of insertion
+        assert list(store.lengths[store.ids()]) == [3, 3, 5]
+
 
 class TestAssembly:
     """ Test class for Assembly class in sequence assembly module. """
@@ -93,9 +191,54 @@ class TestAssembly:
 
         assert seq3 == check_seq3
 
+        obj4 = Assembly(sequences=kmers_seqs, jobs=2)
+        assert obj4.assembled_sequence == check_seq1
+
+        # duplicate reads are merged into one contig
+        reads = ['CTGGTAGCAGTAGCGTTTAAAGCGC', 'GCAGTAGCGTTTAAAGCGCAATGCA', 'CTGGTAGCAGTAGCGTTTAAAGCGC']
+        assert obj4.de_novo_assembly(sequences=reads) == 'CTGGTAGCAGTAGCGTTTAAAGCGCAATGCA'
+
         # check if raises error for wrong file format
         with pytest.raises(ValueError, match=r".* not supported .*"):
             Assembly(sequences=kmers_seqs, output_path=wrong_path)
 
         with pytest.raises(ValueError, match=r".* not supported .*"):
             Assembly(sequences=wrong_path)
+
+    def test_exact_overlap_assembly(self):
+        """ Checks if exact suffix-prefix overlaps give the same assembly as local alignment. """
+        for file in [kmers_seqs, fastq_file, fasta_file]:
+            exact = Assembly(sequences=file, overlap='exact').assembled_sequence
+            assert exact == Assembly(sequences=file).assembled_sequence
+
+        # duplicate and contained reads are ignored
+        reads = ['GATTACAGG', 'ACAGGTTCA', 'GATTACAGG', 'CAGGTT']
+        obj = Assembly(sequences=kmers_seqs, overlap='exact')
+        assert obj.de_novo_assembly(sequences=reads) == 'GATTACAGGTTCA'
+
+        # reads shorter than the seed length are seeded by the whole read
+        reads = ['GATTACAGGTTCA', 'TTAC', 'GGTTCAC', 'A', 'TTTT']
+        assert Assembly._remove_contained(reads, k=12) == ['GATTACAGGTTCA', 'GGTTCAC', 'TTTT']
+
+        with pytest.raises(ValueError, match=r".* not supported .*"):
+            Assembly(sequences=kmers_seqs, overlap='suffix')
+
+    def test_de_bruijn_assembly(self):
+        """ Checks if the De Bruijn graph engine reconstructs the sequence from its reads. """
+        assert Assembly(sequences=kmers_seqs, engine='dbg').assembled_sequence == check_seq1
+        assert Assembly(sequences=fastq_file, engine='dbg', k=7).assembled_sequence == 'CCCATATCTAGGGCATATTTACTCCCGTATCA'
+
+        graph = DeBruijnGraph(k=4)
+        graph.add_reads(read for read in ['GATTAC', 'TTACAG', 'ACAGGT'])
+        assert graph.contigs() == ['GATTACAGGT']
+
+        with pytest.raises(ValueError, match=r".* not supported .*"):
+            Assembly(sequences=kmers_seqs, engine='olc')
+
+    def test_packed_assembly(self):
+        """ Checks if reads packed with 2 bits per base are assembled like reads from the file. """
+        assert Assembly(sequences=kmers_seqs, engine='dbg', packed=True).assembled_sequence == check_seq1
+        assert Assembly(sequences=kmers_seqs, overlap='exact', packed=True).assembled_sequence == check_seq1
+
+        packed = FastaTools.packed_reads(fastq_file)
+        assert Assembly(sequences=packed, engine='dbg', k=7).assembled_sequence == 'CCCATATCTAGGGCATATTTACTCCCGTATCA'
@@ -1,10 +1,12 @@
 import pandas as pd
+import uuid
 
 from werkzeug.utils import secure_filename
-from flask import Flask, flash, render_template, request, redirect, url_for
+from flask import Flask, flash, render_template, request, redirect, url_for, jsonify, abort
 from group4.sequence_assembly import *
 from group4.gene_finder import *
 from group4.Blast import *
+from group4.jobs import JobQueue
 from group4.utils import UPLOAD_FOLDER
 
 ALLOWED_EXTENSIONS = {"fasta", "txt", "fastq"}
@@ -15,6 +17,13 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_PATH'] = 16 * 1024 * 1024
 
+# pipeline jobs run by worker processes, or by threads of this process if processes can not be started,
+# jobs and their uploads are removed JOB_RETENTION_DAYS after their last update
+job_queue = JobQueue(workers=int(os.environ.get('JOB_WORKERS', '2')),
+                     processes=os.environ.get('JOB_PROCESSES', '1') != '0',
+                     retention=float(os.environ.get('JOB_RETENTION_DAYS', '7')) * 24 * 3600)
+job_queue.cleanup()
+
 
 @app.route("/")
 def home():
@@ -23,7 +32,7 @@ def home():
 
 def allowed_file(filename):
     return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+           FastaTools.file_format(filename.lower()) in ALLOWED_EXTENSIONS
 
 
 @app.route('/upload')
@@ -34,46 +43,39 @@ def upload():
 @app.route('/uploader', methods=['GET', 'POST'])
 def upload_file():
     import os
-    file = request.files['file']
     if request.method == 'POST':
-        if file.filename == '':
+        file = request.files.get('file')
+        if file is None or file.filename == '':
             flash('No file selected')
             return render_template('upload.html')
-        elif file and allowed_file(file.filename):
+        elif allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-            txtfile = open(str(os.path.join(UPLOAD_FOLDER, 'filename.txt')), "w")
-            txtfile.write(filename)
-            txtfile.close()
-            flash('File uploaded successfully')
-            result1 = get1()  # Assembled DNA
-            obj=Translate(dna=result1)
-            result2=''.join(obj.f_mrna)  # mRNA seq
-            result3=''.join(obj.r_mrna)  # Reversed mRNA seq
-            aa_seq= obj.proteins
-            print(aa_seq)
-            txtfile = open(str(os.path.join(UPLOAD_FOLDER, 'ORFList.txt')), "w")
-            txtfile.write(str(aa_seq))
-            txtfile.close()
-            final_dict = Blast_orfs(obj.proteins)
-            obj.proteins_table['predicted_proteins'] = obj.proteins_table['amino_acid_sequence'].apply(lambda x: final_dict[x])
-            print(final_dict)
-            result4=obj.proteins_table
-            return render_template('upload.html', rs1=result1, rs2=result2, rs3=result3, tables=[result4.to_html(classes='data', header="true")])
+            path = os.path.join(app.config['UPLOAD_FOLDER'], uuid.uuid4().hex + '_' + filename)  # one file per job
+            file.save(path)
+            job_queue.cleanup()
+            job_id = job_queue.submit(path, move=True)  # the upload is removed with the job
+            if request.accept_mimetypes.best == 'application/json':
+                return jsonify(job_id=job_id, url=url_for('job', job_id=job_id)), 202
+            flash(f'File uploaded successfully, job {job_id} is queued')
+            return redirect(url_for('job', job_id=job_id))
         else:
             flash('Not allowed')
             return render_template('upload.html')
     return redirect(url_for('home'))
 
 
-def get1():
-    txtfile = open(str(os.path.join(UPLOAD_FOLDER, 'filename.txt')), "r")
-    txtfiledata = txtfile.read()
-    txtfile.close()
-    fastafilepath = os.path.join(UPLOAD_FOLDER, txtfiledata)
-    obj = Assembly(sequences=str(fastafilepath))
-    seq = obj.assembled_sequence
-    return seq
+@app.route('/jobs/<job_id>')
+def job(job_id):
+    status = job_queue.status(job_id)
+    if status is None:
+        abort(404)
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(status)
+    result = job_queue.result(job_id)
+    if result is None:
+        return render_template('job.html', job_id=job_id, status=status)
+    return render_template('job.html', job_id=job_id, status=status, rs1=result['assembled'], rs2=result['f_mrna'],
+                           rs3=result['r_mrna'], tables=[result['table']])
 
 
 if __name__ == '__main__':